@@ -0,0 +1,63 @@
+'''How long the event loop is held up by normalizing urls, with and without
+url.aio'''
+
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import corpus
+import url
+import url.aio
+
+OPERATIONS = ['defrag', 'abspath', 'escape']
+
+
+async def heartbeat(lags, interval=0.001):
+    '''Record how late each tick of the loop is, until cancelled'''
+    while True:
+        start = time.time()
+        await asyncio.sleep(interval)
+        lags.append(time.time() - start - interval)
+
+
+async def inline(urls):
+    base = url.parse('http://example.com/page')
+    for u in urls:
+        base.relative(u).defrag().abspath().escape()
+
+
+async def offloaded(urls, executor=None):
+    async for _ in url.aio.normalize(urls, OPERATIONS,
+            base='http://example.com/page', executor=executor):
+        pass
+
+
+async def measure(name, count, coroutine):
+    lags = []
+    ticker = asyncio.ensure_future(heartbeat(lags))
+    await asyncio.sleep(0.01)
+    start = time.time()
+    await coroutine
+    seconds = time.time() - start
+    # Give the last (possibly very late) tick a chance to be recorded
+    await asyncio.sleep(0.01)
+    ticker.cancel()
+    lags.sort()
+    corpus.report(name, count, seconds)
+    print('%-40s %9.1f ms max, %.1f ms p99' % ('  loop lag',
+        1000 * lags[-1], 1000 * lags[int(len(lags) * 0.99)]))
+
+
+def main(count=50000):
+    urls = corpus.urls(count)
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(measure('inline', count, inline(urls)))
+    loop.run_until_complete(
+        measure('url.aio (threads)', count, offloaded(urls)))
+    with ProcessPoolExecutor(2) as executor:
+        loop.run_until_complete(measure('url.aio (2 processes)', count,
+            offloaded(urls, executor)))
+
+
+if __name__ == '__main__':
+    main()
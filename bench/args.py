@@ -0,0 +1,54 @@
+'''Several edits to each url's query, through query_args and by hand'''
+
+import time
+
+import corpus
+import url
+
+
+def by_hand(parsed):
+    '''Each edit splits and joins the query all over again'''
+    parsed.filter_params(lambda name, _: name == 'utm_source')
+    parsed.filter_params(lambda name, _: name == 'utm_medium')
+    query = parsed.query
+    parsed._query = query + '&ref=bench' if query else 'ref=bench'
+    parsed._query = '&'.join(
+        'page=1' if arg.startswith('page=') else arg
+        for arg in parsed.query.split('&'))
+    return str(parsed)
+
+
+def with_view(parsed):
+    args = parsed.query_args
+    args.discard('utm_source')
+    args.discard('utm_medium')
+    args.add('ref', 'bench')
+    if 'page' in args:
+        args['page'] = '1'
+    return str(parsed)
+
+
+def main(count=200000):
+    # As they come, and with the long tracking-laden queries that make the
+    # splitting add up
+    short = [url.parse(u) for u in corpus.urls(count)]
+    tail = '&'.join('arg%d=%d' % (i, i) for i in range(30))
+    lengthy = [url.parse(str(u)) for u in short]
+    for u in lengthy:
+        u._query = u.query + '&' + tail if u.query else tail
+
+    for name, parsed in (('corpus', short), ('30 more args', lengthy)):
+        start = time.time()
+        for u in parsed:
+            by_hand(u.copy())
+        corpus.report('split and join per edit, %s' % name, count,
+            time.time() - start)
+
+        start = time.time()
+        for u in parsed:
+            with_view(u.copy())
+        corpus.report('query_args, %s' % name, count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
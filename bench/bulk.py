@@ -0,0 +1,38 @@
+'''Normalizing a file through a memory map, against reading it line by line'''
+
+import os
+import tempfile
+import time
+
+import corpus
+import url
+import url.bulk
+
+OPERATIONS = ['defrag', 'abspath', 'escape']
+
+
+def main(count=500000):
+    fd, path = tempfile.mkstemp()
+    try:
+        with os.fdopen(fd, 'wb') as fout:
+            for u in corpus.urls(count):
+                fout.write(u.encode('utf-8') + b'\n')
+
+        pipeline = url.compile(OPERATIONS, output='utf8')
+        start = time.time()
+        with open(path, 'rb') as fin:
+            with open(os.devnull, 'wb') as fout:
+                for line in fin:
+                    fout.write(pipeline(line.rstrip(b'\r\n')) + b'\n')
+        corpus.report('lines through url.compile', count, time.time() - start)
+
+        start = time.time()
+        with open(os.devnull, 'wb') as fout:
+            url.bulk.normalize(path, fout, OPERATIONS)
+        corpus.report('url.bulk.normalize', count, time.time() - start)
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
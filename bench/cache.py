@@ -0,0 +1,43 @@
+'''Normalizing a crawl-like stream of repeated links with and without a cache'''
+
+import random
+import time
+
+import corpus
+import url
+import url.cache
+
+OPERATIONS = ['defrag', ('deparam', ['utm_source', 'utm_medium']), 'abspath',
+    'escape']
+
+
+def main(count=200000, distinct=20000):
+    # Links repeat heavily across pages, so draw from a smaller pool
+    pool = corpus.urls(distinct)
+    rand = random.Random(0)
+    urls = [rand.choice(pool) for _ in range(count)]
+    operations = url.pipeline.chain(OPERATIONS)
+
+    start = time.time()
+    for u in urls:
+        url.pipeline.apply(url.parse(u), operations).unicode()
+    corpus.report('uncached', count, time.time() - start)
+
+    cache = url.cache.Cache(distinct // 2)
+    normalize = cache.normalizer(OPERATIONS)
+    start = time.time()
+    for u in urls:
+        normalize(u)
+    corpus.report('cached (half the distinct urls)', count, time.time() - start)
+    print(cache.info())
+
+    cache = url.cache.Cache(distinct)
+    start = time.time()
+    for u in urls:
+        cache.parse(u)
+    corpus.report('cached parse', count, time.time() - start)
+    print(cache.info())
+
+
+if __name__ == '__main__':
+    main()
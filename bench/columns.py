@@ -0,0 +1,23 @@
+'''Counting urls per pld with parse_columns, against URL objects'''
+
+import time
+from collections import Counter
+
+import corpus
+import url
+
+
+def main(count=200000):
+    urls = corpus.urls(count)
+
+    start = time.time()
+    Counter(url.parse(u).pld() for u in urls)
+    corpus.report('url.parse and pld()', count, time.time() - start)
+
+    start = time.time()
+    url.parse_columns(urls).counts('pld')
+    corpus.report('url.parse_columns and counts', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+'''Deterministic synthetic url corpora shared by the benchmarks'''
+
+import os
+import random
+import sys
+
+# Make the in-tree `url` importable when running `python bench/<script>.py`
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+HOSTS = [
+    'www.example.com', 'example.co.uk', 'blog.foo.org', 'shop.bar.com.au',
+    'static.cdn.net', 'news.ycombinator.com', 'www.kündigen.de',
+    'en.wikipedia.org', 'a.b.c.d.example.jp', 'localhost'
+]
+
+PATHS = [
+    '/', '/index.html', '/a/b/../c/./d', '/search', '/über/straße',
+    '/products/12345/reviews', '//double//slashes/', '/danny\'s pub',
+    '/%7Euser/page%2Ehtml', '/static/js/app.min.js'
+]
+
+QUERIES = [
+    '', 'q=python', 'utm_source=news&utm_medium=email&id=4', 'b=2&a=1&&c=3',
+    'page=2&sort=desc', 'fbclid=abc123&ref=home', 'x=%5B1,2%5D'
+]
+
+
+def urls(count, seed=0):
+    '''Return a list of `count` pseudo-random urls'''
+    rand = random.Random(seed)
+    result = []
+    for _ in range(count):
+        url = 'http%s://%s%s' % (
+            rand.choice(['', 's']), rand.choice(HOSTS), rand.choice(PATHS))
+        query = rand.choice(QUERIES)
+        if query:
+            url += '?' + query
+        if rand.random() < 0.2:
+            url += '#section-%d' % rand.randint(0, 9)
+        result.append(url)
+    return result
+
+
+def report(name, count, seconds):
+    '''Print a single benchmark result line'''
+    print('%-40s %12.0f urls/sec' % (name, count / seconds))
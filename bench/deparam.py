@@ -0,0 +1,45 @@
+'''Stripping a few hundred tracking parameters from every url'''
+
+import time
+
+import corpus
+import url
+
+# A blocklist of roughly the size used in practice
+NAMES = ['fbclid', 'gclid', 'dclid', 'msclkid', 'mc_eid', 'mc_cid'] + [
+    'vendor%d_sid' % i for i in range(300)]
+PATTERNS = NAMES + ['utm_*', 'pk_*', '*sessionid']
+
+
+def filter_params(parsed, names):
+    '''What deparam did before: a set and a closure for every call'''
+    lowered = set([p.lower() for p in names])
+
+    def function(name, _):
+        return name.lower() in lowered
+    parsed.filter_params(function)
+
+
+def main(count=200000):
+    parsed = [url.parse(u) for u in corpus.urls(count)]
+
+    start = time.time()
+    for u in parsed:
+        filter_params(u.copy(), NAMES)
+    corpus.report('filter_params with a set', count, time.time() - start)
+
+    start = time.time()
+    for u in parsed:
+        u.copy().deparam(NAMES)
+    corpus.report('deparam(names)', count, time.time() - start)
+
+    params = url.ParamFilter(PATTERNS)
+    start = time.time()
+    for u in parsed:
+        u.copy().deparam(params)
+    corpus.report('deparam(ParamFilter) with globs', count,
+        time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
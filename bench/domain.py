@@ -0,0 +1,31 @@
+'''Per-url pld() and tld() lookups, which are memoized per host'''
+
+import time
+
+import corpus
+import url
+
+
+def main(count=200000):
+    parsed = [url.parse(u) for u in corpus.urls(count)]
+
+    start = time.time()
+    for u in parsed:
+        url.psl.get_public_suffix(u.host)
+    corpus.report('psl.get_public_suffix (unmemoized)', count,
+        time.time() - start)
+
+    start = time.time()
+    for u in parsed:
+        u.pld()
+        u.tld()
+    corpus.report('pld() and tld()', count, time.time() - start)
+
+    start = time.time()
+    for u in parsed:
+        u.domain_parts()
+    corpus.report('domain_parts()', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
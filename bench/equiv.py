@@ -0,0 +1,30 @@
+'''Comparing one url against many candidates with URL.equiv'''
+
+import time
+
+import corpus
+import url
+
+
+def main(count=20000):
+    target = url.parse('https://www.example.com/search?q=python')
+    candidates = [url.parse(u) for u in corpus.urls(count)]
+
+    start = time.time()
+    for candidate in candidates:
+        target.equiv(candidate)
+    corpus.report('equiv, cold keys', count, time.time() - start)
+
+    start = time.time()
+    for candidate in candidates:
+        target.equiv(candidate)
+    corpus.report('equiv, cached keys', count, time.time() - start)
+
+    start = time.time()
+    for candidate in candidates:
+        target.equiv(str(candidate))
+    corpus.report('equiv against strings', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+'''Strict escaping with the table-driven encoder against the original regex'''
+
+import re
+import sys
+import time
+
+import corpus
+import url
+
+PERCENT_ESCAPING_RE = re.compile('(%([a-fA-F0-9]{2})|.)', re.S)
+
+
+def regex_percent_encode(raw, safe):
+    '''The original, character-at-a-time version of URL.percent_encode'''
+    def replacement(match):
+        string = match.group(1)
+        if len(string) == 1:
+            if string in safe:
+                return string
+            else:
+                if sys.version_info[0] == 3:
+                    e = ['%%%02X' % b for b in string.encode('utf-8')]
+                    return ''.join(e)
+                else:
+                    return '%%%02X' % ord(string)
+        else:
+            character = chr(int(match.group(2), 16))
+            if (character in safe) and not (character in url.URL.RESERVED):
+                return character
+            return string.upper()
+
+    return PERCENT_ESCAPING_RE.sub(replacement, raw)
+
+
+def main(count=50000):
+    parsed = [url.parse(u) for u in corpus.urls(count)]
+    # Long query strings are the worst case for the original
+    components = [(u.path, u.query * 10) for u in parsed]
+
+    for name, encode in [('regex', regex_percent_encode),
+                         ('table-driven', url.URL.percent_encode)]:
+        start = time.time()
+        for path, query in components:
+            encode(path, url.URL.PATH)
+            encode(query, url.URL.QUERY)
+        corpus.report('%s percent_encode' % name, count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+'''punycode() and unpunycode() on mostly-ASCII hosts'''
+
+import time
+
+import corpus
+import url
+
+
+def codec(host):
+    '''What punycode() did before the ASCII fast path and cache'''
+    return host.encode('idna').decode('utf-8')
+
+
+def main(count=200000):
+    # About one host in a hundred is internationalized
+    hosts = [url.parse(u).host for u in corpus.urls(count)]
+    for index in range(0, count, 100):
+        hosts[index] = u'bücher-%d.example' % (index % 1000)
+    punycoded = [url.to_ascii(host) for host in hosts]
+
+    start = time.time()
+    for host in hosts:
+        codec(host)
+    corpus.report('idna codec', count, time.time() - start)
+
+    for uts46 in (False, True):
+        start = time.time()
+        for host in hosts:
+            url.to_ascii(host, uts46)
+        corpus.report('to_ascii(uts46=%s)' % uts46, count,
+            time.time() - start)
+
+        start = time.time()
+        for host in punycoded:
+            url.to_unicode(host, uts46)
+        corpus.report('to_unicode(uts46=%s)' % uts46, count,
+            time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+'''Time taken to import url, and to load the public suffix list on first use'''
+
+import subprocess
+import sys
+import time
+
+from corpus import ROOT
+
+
+def measure(code, repeat=10):
+    '''Best wall-clock time of running code in a fresh interpreter'''
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code], cwd=ROOT)
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    baseline = measure('pass')
+    for name, code in [
+            ('import url', 'import url'),
+            ('import url; url.load_psl()', 'import url; url.load_psl()')]:
+        print('%-40s %12.1f ms' % (name, 1000 * (measure(code) - baseline)))
+
+
+if __name__ == '__main__':
+    main()
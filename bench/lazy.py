@@ -0,0 +1,25 @@
+'''Eager versus lazy parsing when only pld() is needed'''
+
+import time
+
+import corpus
+import url
+
+
+def main(count=200000):
+    urls = corpus.urls(count)
+
+    for lazy in (False, True):
+        start = time.time()
+        for u in urls:
+            url.parse(u, lazy=lazy).pld()
+        corpus.report('parse(lazy=%s).pld()' % lazy, count, time.time() - start)
+
+        start = time.time()
+        for u in urls:
+            str(url.parse(u, lazy=lazy))
+        corpus.report('str(parse(lazy=%s))' % lazy, count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+'''Bytes of memory held per parsed URL object, as measured by tracemalloc'''
+
+import gc
+import sys
+import tracemalloc
+
+import corpus
+import url
+
+
+def measure(urls, function):
+    '''Return the bytes per url held by the results of function(url)'''
+    gc.collect()
+    tracemalloc.start()
+    results = [function(u) for u in urls]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return float(current) / len(urls)
+
+
+def main(count=1000000):
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    urls = corpus.urls(count)
+    print('%-40s %12.1f bytes/url' % ('str (baseline)',
+        measure(urls, lambda u: str(url.parse(u)))))
+    print('%-40s %12.1f bytes/url' % ('URL',
+        measure(urls, url.parse)))
+    print('%-40s %12.1f bytes/url' % ('URL (lazy)',
+        measure(urls, lambda u: url.parse(u, lazy=True))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+'''Throughput of url.parallel.normalize as the number of processes grows'''
+
+import time
+from multiprocessing import cpu_count
+
+import corpus
+import url
+import url.parallel
+
+OPERATIONS = ['defrag', ('deparam', ['utm_source', 'utm_medium']), 'abspath',
+    'escape', 'punycode', 'canonical']
+
+
+def main(count=200000):
+    urls = corpus.urls(count)
+    operations = url.pipeline.chain(OPERATIONS)
+
+    start = time.time()
+    for u in urls:
+        try:
+            url.pipeline.apply(url.parse(u), operations).unicode()
+        except ValueError:
+            pass
+    corpus.report('serial', count, time.time() - start)
+
+    processes = 1
+    while processes <= cpu_count():
+        start = time.time()
+        for _ in url.parallel.normalize(urls, OPERATIONS, processes, 2000):
+            pass
+        corpus.report('parallel, %d processes' % processes, count,
+            time.time() - start)
+        processes *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+'''url.parse on ASCII and non-ASCII urls, as unicode and as bytes'''
+
+import time
+from unicodedata import normalize
+
+import corpus
+import url
+from url import URL
+
+
+def general(u, encoding='utf-8'):
+    '''What parse did before: always normalize, and go through __init__'''
+    if isinstance(u, bytes):
+        u = u.decode(encoding)
+    parsed = url.urlparse(normalize('NFC', u))
+    return URL(parsed.scheme, parsed.hostname, URL.split_port(parsed),
+        parsed.path, parsed.params, parsed.query, parsed.fragment,
+        URL.split_userinfo(parsed))
+
+
+def main(count=200000):
+    ascii = [str(u) for u in corpus.urls(count)]
+    # The same urls with an internationalized host and path
+    unicode = [u.replace('.com/', u'.b\xfccher.com/\xe9t\xe9/', 1)
+        for u in ascii]
+    cases = [
+        ('ascii str', ascii),
+        ('ascii bytes', [u.encode('utf-8') for u in ascii]),
+        ('non-ascii str', unicode),
+        ('non-ascii bytes', [u.encode('utf-8') for u in unicode])
+    ]
+    for name, urls in cases:
+        start = time.time()
+        for u in urls:
+            general(u)
+        corpus.report('general path, %s' % name, count, time.time() - start)
+
+        start = time.time()
+        for u in urls:
+            url.parse(u)
+        corpus.report('url.parse, %s' % name, count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
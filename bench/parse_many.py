@@ -0,0 +1,24 @@
+'''Compare url.parse_many against a loop of url.parse'''
+
+import time
+
+import corpus
+import url
+
+
+def main(count=200000):
+    urls = corpus.urls(count)
+
+    start = time.time()
+    for u in urls:
+        url.parse(u)
+    corpus.report('loop of url.parse', count, time.time() - start)
+
+    start = time.time()
+    for u in url.parse_many(urls):
+        pass
+    corpus.report('url.parse_many', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+'''A compiled Pipeline against the equivalent chain of URL methods'''
+
+import time
+
+import corpus
+import url
+
+CHAINS = [
+    ['defrag', ('deparam', ['utm_source', 'utm_medium']), 'abspath',
+        'escape', 'punycode'],
+    ['sanitize', 'canonical', 'deuserinfo']
+]
+
+
+def main(count=200000):
+    urls = corpus.urls(count)
+    for operations in CHAINS:
+        print(operations)
+        chain = url.pipeline.chain(operations)
+
+        start = time.time()
+        for u in urls:
+            parsed = url.parse(u)
+            for name, args in chain:
+                getattr(parsed, name)(*args)
+            parsed.utf8()
+        corpus.report('chained', count, time.time() - start)
+
+        pipeline = url.compile(operations, output='utf8')
+        start = time.time()
+        for u in urls:
+            pipeline(u)
+        corpus.report('url.compile', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
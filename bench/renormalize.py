@@ -0,0 +1,30 @@
+'''Calling sanitize(), equiv() and escape() again on the same urls'''
+
+import time
+
+import corpus
+import url
+
+
+def main(count=100000):
+    parsed = [url.parse(u) for u in corpus.urls(count)]
+
+    start = time.time()
+    for u in parsed:
+        u.sanitize()
+    corpus.report('sanitize()', count, time.time() - start)
+
+    start = time.time()
+    for u in parsed:
+        u.sanitize().escape()
+    corpus.report('sanitize().escape() again', count, time.time() - start)
+
+    start = time.time()
+    for u in parsed:
+        u.canonical().abspath().escape()
+    corpus.report('canonical().abspath().escape() again', count,
+        time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+'''The single-pass scanner against urlparse and its netloc properties'''
+
+import time
+
+import corpus
+import url
+from url import URL
+from url.scanner import scan
+
+
+def main(count=200000):
+    urls = [str(u) for u in corpus.urls(count)]
+    scanned = sum(1 for u in urls if scan(u) is not None)
+    print('%d of %d urls scanned' % (scanned, count))
+
+    start = time.time()
+    for u in urls:
+        parsed = url.urlparse(u)
+        parsed.hostname
+        URL.split_port(parsed)
+        URL.split_userinfo(parsed)
+    corpus.report('urlparse and properties', count, time.time() - start)
+
+    start = time.time()
+    for u in urls:
+        URL.split_result(url.urlparse(u))
+    corpus.report('urlparse and split_netloc', count, time.time() - start)
+
+    start = time.time()
+    for u in urls:
+        scan(u)
+    corpus.report('scan', count, time.time() - start)
+
+    start = time.time()
+    for u in urls:
+        url.parse(u)
+    corpus.report('url.parse', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
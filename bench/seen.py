@@ -0,0 +1,56 @@
+'''Bytes per url held by a SeenSet, against a set of utf8() strings'''
+
+import gc
+import time
+import tracemalloc
+
+import corpus
+import url
+import url.seen
+
+
+def held(function):
+    '''Return the bytes held by the result of function()'''
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def strings(urls):
+    return set(url.parse(u).utf8() for u in urls)
+
+
+def table(urls):
+    seen = url.seen.SeenSet()
+    seen.add_many(urls)
+    return seen
+
+
+def bloom(urls):
+    seen = url.seen.SeenSet(len(urls), 'bloom', 0.001)
+    seen.add_many(urls)
+    return seen
+
+
+def main(count=200000):
+    # Distinct urls, since that's what a seen set fills up with
+    urls = ['http://host%d.example.com/path/%d?q=%d' % (index, index, index)
+        for index in range(count)]
+    start = time.time()
+    strings(urls)
+    corpus.report('set of utf8()', count, time.time() - start)
+    print('%-40s %12.1f bytes/url' % ('',
+        float(held(lambda: strings(urls))) / count))
+
+    for name, function in (('SeenSet', table), ('SeenSet (bloom)', bloom)):
+        start = time.time()
+        seen = function(urls)
+        corpus.report(name, count, time.time() - start)
+        print('%-40s %12.1f bytes/url' % ('', float(seen.memory()) / count))
+
+if __name__ == '__main__':
+    main()
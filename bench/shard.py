@@ -0,0 +1,33 @@
+'''Sharding urls by pld with url.shard, against parsing and hashing each'''
+
+import time
+
+import corpus
+import url
+import url.shard
+
+SHARDS = 64
+
+
+def main(count=200000):
+    urls = corpus.urls(count)
+
+    start = time.time()
+    for u in urls:
+        url.shard.stable_hash(url.parse(u).pld()) % SHARDS
+    corpus.report('parse, pld, hash, mod', count, time.time() - start)
+
+    sharder = url.shard.Sharder(SHARDS)
+    start = time.time()
+    for u in urls:
+        sharder(u)
+    corpus.report('Sharder', count, time.time() - start)
+
+    sharder = url.shard.Sharder(SHARDS)
+    start = time.time()
+    sharder.shard_many(urls)
+    corpus.report('Sharder.shard_many', count, time.time() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+'''Public suffix lookups/sec and per-process memory: publicsuffix vs. index'''
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import corpus
+import url.suffix
+
+# Run in a fresh process to see how much memory each engine costs it
+MEMORY = '''
+import io, sys, url.suffix
+
+def memory():
+    # Resident and private (unshared) memory of this process, in kB
+    fields = {}
+    with open('/proc/self/smaps_rollup') as fin:
+        for line in fin:
+            parts = line.split()
+            if len(parts) == 3:
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return fields['Rss'], fields['Private_Clean'] + fields['Private_Dirty']
+
+before = memory()
+if sys.argv[1] == 'index':
+    engine = url.suffix.SuffixIndex.load(sys.argv[2])
+else:
+    import publicsuffix
+    engine = publicsuffix.PublicSuffixList(
+        io.open(url.suffix.default_source(), encoding='utf-8'))
+for host in sys.argv[3:]:
+    engine.get_public_suffix(host)
+after = memory()
+print('%d %d' % (after[0] - before[0], after[1] - before[1]))
+'''
+
+
+def hosts():
+    '''Hosts drawn from the rules of the list, as well as the corpus'''
+    result = list(corpus.HOSTS)
+    with io.open(url.suffix.default_source(), encoding='utf-8') as fin:
+        for labels, _ in url.suffix.rules(fin):
+            result.append('www.example.' + '.'.join(labels).replace('*', 'x'))
+    return result
+
+
+def main():
+    import publicsuffix
+    names = hosts()
+    index = os.path.join(tempfile.mkdtemp(), 'suffixes.idx')
+    url.suffix.compile_file(url.suffix.default_source(), index)
+
+    with io.open(url.suffix.default_source(), encoding='utf-8') as fin:
+        engines = [
+            ('publicsuffix', publicsuffix.PublicSuffixList(fin)),
+            ('url.suffix index', url.suffix.SuffixIndex.load(index))]
+    for name, engine in engines:
+        start = time.time()
+        for host in names:
+            engine.get_public_suffix(host)
+        print('%-40s %12.0f lookups/sec' % (
+            name, len(names) / (time.time() - start)))
+
+    if os.path.exists('/proc/self/smaps_rollup'):
+        for name in ('publicsuffix', 'index'):
+            output = subprocess.check_output([sys.executable, '-c', MEMORY,
+                name, index] + names[::10], cwd=corpus.ROOT)
+            rss, private = [int(v) for v in output.split()]
+            print('%-40s %8d kB RSS %8d kB private' % (name, rss, private))
+
+    os.remove(index)
+    os.rmdir(os.path.dirname(index))
+
+
+if __name__ == '__main__':
+    main()
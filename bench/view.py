@@ -0,0 +1,49 @@
+'''Reading the hosts of urls in a buffer with views, against parsing them'''
+
+import gc
+import sys
+import time
+import tracemalloc
+
+import corpus
+import url
+
+
+def held(function):
+    '''Return the bytes held by the results of function()'''
+    gc.collect()
+    tracemalloc.start()
+    results = function()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return current
+
+
+def main(count=200000):
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    buffer = b'\n'.join(u.encode('utf-8') for u in corpus.urls(count))
+    lines = buffer.split(b'\n')
+    viewed = sum(1 for view in url.views(buffer) if view._url is None)
+    print('%d of %d urls viewed in place' % (viewed, count))
+
+    start = time.time()
+    for line in lines:
+        url.parse(line).host
+    corpus.report('url.parse(line).host', count, time.time() - start)
+
+    start = time.time()
+    for view in url.views(buffer):
+        view.host
+    corpus.report('url.views(buffer) host', count, time.time() - start)
+
+    # Bytes allocated, and still held, per line of the buffer
+    print('%-40s %12.1f bytes/line' % ('URL', float(
+        held(lambda: [url.parse(line) for line in lines])) / count))
+    print('%-40s %12.1f bytes/line' % ('URLView', float(
+        held(lambda: list(url.views(buffer)))) / count))
+
+
+if __name__ == '__main__':
+    main()
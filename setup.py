@@ -39,7 +39,7 @@ cleaning parameter and query strings, and a little more sanitization.
 	author           = 'Dan Lecocq',
 	author_email     = 'dan@seomoz.org',
 	url              = 'http://github.com/seomoz/url-py',
-	py_modules       = ['url'],
+	packages         = ['url'],
 	license          = 'MIT',
 	platforms        = 'Posix; MacOS X',
 	test_suite       = 'tests.testReppy',
@@ -52,6 +52,9 @@ cleaning parameter and query strings, and a little more sanitization.
 		'Programming Language :: Python :: 3.3',
 		'Programming Language :: Python :: 3.4',
 		'Topic :: Internet :: WWW/HTTP'],
+	entry_points     = {
+		'console_scripts': ['url-normalize = url.__main__:main']
+	},
 	install_requires = [
 		'publicsuffix'
 	],
@@ -0,0 +1,1323 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''This is a module for dealing with urls. In particular, sanitizing them.'''
+
+import fnmatch
+import hashlib
+import io
+import re
+import sys
+from collections import namedtuple
+if sys.version_info[0] == 3:
+    from urllib.parse import quote as urlquote
+    from urllib.parse import unquote as urlunquote
+    from urllib.parse import urlparse, urlunparse, urljoin
+    byte_string = bytes
+    string_type = (str, bytes)
+    unicode_text = str
+else:
+    from urllib import quote as urlquote
+    from urllib import unquote as urlunquote
+    from urlparse import urlparse, urlunparse, urljoin
+    byte_string = str
+    string_type = basestring
+    unicode_text = unicode
+from unicodedata import normalize as unicodenormalize
+
+from .scanner import scan
+
+_ASCII = re.compile(r'[\x00-\x7f]*\Z')
+if hasattr(unicode_text, 'isascii'):
+    # Constant time, since Python 3.7
+    is_ascii = unicode_text.isascii
+else:
+    def is_ascii(text):
+        '''Return True if text is all ASCII characters'''
+        return _ASCII.match(text) is not None
+
+# The public suffix list is only read in when it's first needed
+_psl = None
+
+
+def load_psl(path=None):
+    '''Load the public suffix list now rather than on first use. If path is
+    provided, the list is read from that file instead of the built-in one.
+    It may also be an index compiled with `url.suffix`, which is memory-mapped
+    rather than read in.'''
+    global _psl
+    from . import suffix
+    if path is None:
+        from publicsuffix import PublicSuffixList
+        _psl = PublicSuffixList()
+    elif suffix.is_index(path):
+        _psl = suffix.SuffixIndex.load(path)
+    else:
+        from publicsuffix import PublicSuffixList
+        with io.open(path, encoding='utf-8') as fin:
+            _psl = PublicSuffixList(fin)
+    # Anything memoized came from the old list
+    _domain_cache.clear()
+    return _psl
+
+
+def get_psl():
+    '''Return the public suffix list, loading it if need be'''
+    if _psl is None:
+        return load_psl()
+    return _psl
+
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        # Keep `url.psl` working without loading the list at import time
+        if name == 'psl':
+            return get_psl()
+        raise AttributeError(
+            "module %r has no attribute %r" % (__name__, name))
+else:
+    class _LazyPSL(object):
+        '''Stands in for the public suffix list as `url.psl` where modules
+        can't have a __getattr__, loading it on first use'''
+        def __getattr__(self, name):
+            return getattr(get_psl(), name)
+
+    psl = _LazyPSL()
+
+# The (subdomain, pld, tld) of a hostname
+DomainParts = namedtuple('DomainParts', ['subdomain', 'pld', 'tld'])
+
+# There are far fewer hosts than urls, so public suffix lookups are memoized
+# per host, up to this many hosts
+DOMAIN_CACHE_SIZE = 100000
+_domain_cache = {}
+
+
+def domain_parts(host):
+    '''Return the (subdomain, pld, tld) of a hostname'''
+    result = _domain_cache.get(host)
+    if result is None:
+        if sys.version_info[0] == 2:
+            # The list is of unicode suffixes, so the host is looked up as one
+            pld = get_psl().get_public_suffix(
+                host.decode('utf-8')).encode('utf-8')
+        else:
+            pld = get_psl().get_public_suffix(host)
+        tld = '.'.join(pld.split('.')[1:])
+        subdomain = host.rstrip('.')[:-len(pld)].rstrip('.')
+        result = DomainParts(subdomain, pld, tld)
+        _remember(_domain_cache, DOMAIN_CACHE_SIZE, host, result)
+    return result
+
+
+def _remember(cache, size, key, value):
+    '''Memoize value for key in cache, holding at most size entries'''
+    # Evict the oldest entries (or arbitrary ones, before Python 3.7), of
+    # which there may be several if the size has been lowered
+    while cache and len(cache) >= size:
+        del cache[next(iter(cache))]
+    cache[key] = value
+
+
+# Hosts the IDNA 2003 codec returns unchanged: ASCII, with every label but
+# the last (which may be empty, for a trailing dot) 1 to 63 characters long
+_PLAIN_HOST = re.compile(r'(?:[\x00-\x2d\x2f-\x7f]{1,63}\.)*[\x00-\x2d\x2f-\x7f]{0,63}\Z')
+
+# Most hosts are plain ASCII and skip the codec altogether. The rest are
+# memoized per host, up to this many hosts in each direction and mode
+IDNA_CACHE_SIZE = 10000
+_to_ascii_cache = ({}, {})
+_to_unicode_cache = ({}, {})
+
+# Schemes and hosts are repeated across many urls, and urls share one copy of
+# each, up to this many of them. This is a dict of our own rather than intern(),
+# since interned strings are never freed on some versions of Python.
+SHARED_SIZE = 100000
+_shared = {}
+
+
+def _uts46_map(host):
+    '''Map a unicode host the way UTS #46 does, near enough: compatibility
+    forms are folded, it's lowercased, and ideographic full stops separate
+    labels like any other dot.'''
+    host = unicodenormalize('NFKC', unicodenormalize('NFKC', host).lower())
+    return host.replace(u'\u3002', u'.')
+
+
+def _uts46_to_ascii(host):
+    '''Punycode each non-ASCII label, without IDNA 2003 nameprep or any
+    checks on label length'''
+    labels = _uts46_map(host).split(u'.')
+    for index, label in enumerate(labels):
+        if not is_ascii(label):
+            labels[index] = u'xn--' + label.encode('punycode').decode('ascii')
+    return u'.'.join(labels)
+
+
+def _uts46_to_unicode(host):
+    '''Decode each punycoded label, leaving those that can't be decoded'''
+    labels = _uts46_map(host).split(u'.')
+    for index, label in enumerate(labels):
+        if label.startswith(u'xn--'):
+            try:
+                labels[index] = label[4:].encode('ascii').decode('punycode')
+            except (UnicodeError, ValueError):
+                pass
+    return u'.'.join(labels)
+
+
+def to_ascii(host, uts46=False):
+    '''Return the punycoded version of a hostname. By default this is the
+    IDNA 2003 codec, which raises UnicodeError for hosts it rejects. With
+    uts46, hosts are mapped leniently instead, and it never raises.'''
+    cache = _to_ascii_cache[uts46]
+    result = cache.get(host)
+    if result is None:
+        if uts46:
+            if is_ascii(host):
+                return host.lower()
+            if sys.version_info[0] == 2:
+                result = _uts46_to_ascii(host.decode('utf-8')).encode('utf-8')
+            else:
+                result = _uts46_to_ascii(host)
+        elif _PLAIN_HOST.match(host):
+            return host
+        elif sys.version_info[0] == 2:
+            result = host.decode('utf-8').encode('idna')
+        else:
+            result = host.encode('idna').decode('utf-8')
+        _remember(cache, IDNA_CACHE_SIZE, host, result)
+    return result
+
+
+def to_unicode(host, uts46=False):
+    '''Return the unpunycoded version of a hostname. By default this is the
+    IDNA 2003 codec, which raises UnicodeError for hosts it rejects. With
+    uts46, labels that can't be decoded are left as they are, and it never
+    raises.'''
+    cache = _to_unicode_cache[uts46]
+    result = cache.get(host)
+    if result is None:
+        if uts46:
+            if is_ascii(host) and 'xn--' not in host.lower():
+                return host.lower()
+            if sys.version_info[0] == 2:
+                result = _uts46_to_unicode(host.decode('utf-8')).encode('utf-8')
+            else:
+                result = _uts46_to_unicode(host)
+        elif is_ascii(host) and 'xn--' not in host.lower():
+            return host
+        elif sys.version_info[0] == 2:
+            result = host.decode('utf-8').decode('idna').encode('utf-8')
+        else:
+            result = host.encode('utf-8').decode('idna')
+        _remember(cache, IDNA_CACHE_SIZE, host, result)
+    return result
+
+
+# The default ports associated with each scheme
+PORTS = {
+    'http': 80,
+    'https': 443
+}
+
+
+class InvalidURL(ValueError):
+    '''Raised (or yielded as a marker) when an input cannot be parsed'''
+    def __init__(self, url, reason):
+        ValueError.__init__(self, 'Invalid url %r: %s' % (url, reason))
+        self.url = url
+        self.reason = reason
+
+    def __reduce__(self):
+        # So that markers survive the trip back from worker processes
+        return (InvalidURL, (self.url, self.reason))
+
+
+def _check_errors(errors):
+    '''Raise ValueError unless `errors` is one of the handlers that
+    `parse_many` and the other batch functions take'''
+    if errors not in ('strict', 'ignore', 'replace'):
+        raise ValueError('Unknown errors handler %r' % errors)
+
+
+def parse(url, encoding='utf-8', lazy=False):
+    '''Parse the provided url string and return an URL object'''
+    return URL.parse(url, encoding, lazy)
+
+
+def parse_many(urls, encoding='utf-8', errors='replace'):
+    '''Parse each of the provided urls, yielding URL objects in order.
+
+    Inputs that cannot be parsed are handled according to `errors`:
+        'strict' -- raise InvalidURL
+        'ignore' -- skip the input altogether
+        'replace' -- yield an InvalidURL instance in its place'''
+    _check_errors(errors)
+    # Resolve everything once for the whole batch rather than once per url
+    _parse = URL.parse
+    for url in urls:
+        try:
+            yield _parse(url, encoding)
+        except (TypeError, ValueError) as exc:
+            if errors == 'strict':
+                raise InvalidURL(url, exc)
+            elif errors == 'replace':
+                yield InvalidURL(url, exc)
+
+
+# Netlocs with anything more than a plain hostname: userinfo, a port, an IPv6
+# address, or an escape (which urlparse treats as the start of a zone id)
+_NETLOC_SPECIAL = re.compile(r'[@:\[%]')
+
+# Cleaning up params and query strings, and when it's needed at all
+_PARAMS_UNCLEAN = re.compile(r'^;|;;|;$')
+_PARAMS_LEADING = re.compile(r'^;+')
+_PARAMS_REPEATED = re.compile(r';{2,}')
+_PARAMS_ENDS = re.compile(r'^;|;$')
+_QUERY_UNCLEAN = re.compile(r'^[?&]|&&|&$')
+_QUERY_LEADING = re.compile(r'^\?+')
+_QUERY_REPEATED = re.compile(r'&{2,}')
+_QUERY_ENDS = re.compile(r'^&|&$')
+
+# Indexes into URL._normal, which holds the values of components that are
+# known to already be normalized. Escaping keeps a state per component.
+_PATH, _QUERY, _PARAMS, _USERINFO = range(4)
+_ESCAPED = 0
+_STRICT = 4
+_CANONICAL = 8
+_ABSPATH = 12
+_PUNYCODE = 13
+_UTS46 = 14
+_STATES = 15
+
+
+class PercentEncoder(object):
+    '''Strict percent-encoding for a particular set of safe characters.
+
+    Everything that can be is worked out up front: what each of the possible
+    escapes should become, and how to escape each ASCII character. Runs of
+    safe characters are then passed over in bulk, and a string that needs no
+    changes at all is returned untouched.'''
+
+    HEXDIGITS = '0123456789abcdefABCDEF'
+
+    def __init__(self, safe, reserved):
+        # A '%' is only ever kept when it isn't the start of an escape
+        run = ''.join(re.escape(c) for c in safe if c != '%')
+        # With nothing safe, the class of safe characters matches nothing
+        run = '[%s]' % run if run else r'[^\s\S]'
+        self._clean = re.compile('%s*' % run)
+        self._token = re.compile('%%([0-9a-fA-F]{2})|(%s+)|(.)' % run, re.S)
+
+        # Escapes decode to the character they stand for, if it's safe and not
+        # reserved, or are otherwise just uppercased
+        self._escapes = {}
+        for high in self.HEXDIGITS:
+            for low in self.HEXDIGITS:
+                character = chr(int(high + low, 16))
+                if character in safe and character not in reserved:
+                    self._escapes[high + low] = character
+                else:
+                    self._escapes[high + low] = ('%' + high + low).upper()
+
+        # Single characters that aren't part of an escape
+        self._characters = dict(
+            (chr(o), chr(o) if chr(o) in safe else '%%%02X' % o)
+            for o in range(128))
+
+    def _replace(self, match):
+        index = match.lastindex
+        if index == 1:
+            return self._escapes[match.group(1)]
+        elif index == 2:
+            return match.group(2)
+        character = match.group(3)
+        escaped = self._characters.get(character)
+        if escaped is None:
+            if sys.version_info[0] == 3:
+                escaped = ''.join(
+                    '%%%02X' % b for b in character.encode('utf-8'))
+            else:
+                escaped = '%%%02X' % ord(character)
+        return escaped
+
+    def clean(self, raw):
+        '''Return True if raw is all safe characters, and has no escapes'''
+        return self._clean.match(raw).end() == len(raw)
+
+    def __call__(self, raw):
+        # Most components need no work at all
+        if self.clean(raw):
+            return raw
+        return self._token.sub(self._replace, raw)
+
+
+class ParamFilter(object):
+    '''A precompiled set of query and params names to strip from urls.
+
+    Patterns are matched case-insensitively against names, and may be exact
+    names (`fbclid`), prefixes (`utm_*`) or, failing those, shell-style globs
+    (`*session*id`). Exact names and prefixes are looked up in sets, so the
+    cost of a match doesn't grow with the number of them, and the globs are
+    compiled into a single regular expression. With glob=False, every pattern
+    is an exact name. Names seen before are remembered, and a string with
+    nothing to strip is returned untouched.'''
+
+    GLOB_CHARACTERS = '*?['
+
+    # How many distinct names to remember the verdict on
+    CACHE_SIZE = 10000
+
+    def __init__(self, patterns, glob=True):
+        self.patterns = tuple(patterns)
+        self.glob = glob
+        names, prefixes, globs = set(), set(), []
+        for pattern in self.patterns:
+            pattern = pattern.lower()
+            if not glob or not any(c in pattern for c in self.GLOB_CHARACTERS):
+                names.add(pattern)
+            elif (pattern.endswith('*') and not any(
+                    c in pattern[:-1] for c in self.GLOB_CHARACTERS)):
+                prefixes.add(pattern[:-1])
+            else:
+                globs.append(pattern)
+        self._names = frozenset(names)
+        self._prefixes = frozenset(prefixes)
+        # Only the distinct prefix lengths need to be tried against a name
+        self._lengths = sorted(set(len(prefix) for prefix in prefixes))
+        self._globs = None
+        if globs:
+            self._globs = re.compile('|'.join(
+                '(?:%s)' % fnmatch.translate(pattern) for pattern in globs))
+        self._matches = {}
+
+    def __reduce__(self):
+        return (ParamFilter, (self.patterns, self.glob))
+
+    def __repr__(self):
+        return '<url.ParamFilter %r>' % (list(self.patterns),)
+
+    def match(self, name):
+        '''Return True if the named parameter should be stripped'''
+        result = self._matches.get(name)
+        if result is None:
+            lowered = name.lower()
+            result = lowered in self._names
+            if not result:
+                for length in self._lengths:
+                    if length > len(lowered):
+                        break
+                    if lowered[:length] in self._prefixes:
+                        result = True
+                        break
+            if not result and self._globs is not None:
+                result = self._globs.match(lowered) is not None
+            _remember(self._matches, self.CACHE_SIZE, name, result)
+        return result
+
+    def __call__(self, args, separator):
+        '''Return the separated arguments of a query or params string,
+        without any that match or are empty'''
+        if not args:
+            return args
+        split = args.split(separator)
+        match = self.match
+        kept = [arg for arg in split
+            if arg and not match(arg.partition('=')[0])]
+        if len(kept) == len(split):
+            return args
+        return separator.join(kept)
+
+
+class ArgsView(object):
+    '''An ordered multi-dict view of a url's query or params arguments.
+
+    The component is only split when the view is first used, and values are
+    kept just as they appear in the url (still escaped), with None for an
+    argument that has no '=' at all. Edits are made in place, and the
+    component is only joined back together when something next needs it, so
+    any number of edits cost one split and one join. Methods of the url that
+    change the component are picked up the next time the view is used.'''
+
+    __slots__ = ('_url', '_attr', '_separator', '_source', '_dirty', '_items',
+        '_index', '_removed')
+
+    def __init__(self, url, attr, separator):
+        self._url = url
+        self._attr = attr
+        self._separator = separator
+        # The component as of the last split or join, and whether the view
+        # has been edited since
+        self._source = None
+        self._dirty = False
+        # [name, value] pairs in order, with None for removed ones, and the
+        # positions of each name's pairs
+        self._items = []
+        self._index = {}
+        self._removed = 0
+
+    def _split(self, source):
+        self._source = source
+        self._items = items = []
+        self._index = index = {}
+        self._removed = 0
+        if source:
+            append = items.append
+            for arg in source.split(self._separator):
+                if arg:
+                    name, equals, value = arg.partition('=')
+                    positions = index.get(name)
+                    if positions is None:
+                        index[name] = [len(items)]
+                    else:
+                        positions.append(len(items))
+                    append([name, value if equals else None])
+
+    def _sync(self):
+        '''Split the component again if it's changed under the view'''
+        if not self._dirty:
+            current = getattr(self._url, self._attr)
+            if current is not self._source:
+                self._split(current)
+
+    def _changed(self):
+        '''Mark the view as edited, so the component is joined on demand'''
+        if not self._dirty:
+            self._dirty = True
+            delattr(self._url, self._attr)
+
+    def join(self):
+        '''Return the arguments joined back together into a string'''
+        self._sync()
+        if not self._dirty:
+            return self._source
+        return self._separator.join([
+            item[0] if item[1] is None else item[0] + '=' + item[1]
+            for item in self._items if item])
+
+    def _load(self):
+        '''Join the edited arguments back into the url'''
+        result = self.join()
+        if self._removed * 2 > len(self._items):
+            # Mostly removed arguments, so start over with a compact list
+            self._split(result)
+        self._source = result
+        self._dirty = False
+        return result
+
+    def __len__(self):
+        self._sync()
+        return len(self._items) - self._removed
+
+    def __contains__(self, name):
+        self._sync()
+        return name in self._index
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __getitem__(self, name):
+        '''The value of the first argument with this name'''
+        self._sync()
+        return self._items[self._index[name][0]][1]
+
+    def get(self, name, default=None):
+        '''The value of the first argument with this name, or default'''
+        self._sync()
+        positions = self._index.get(name)
+        if positions is None:
+            return default
+        return self._items[positions[0]][1]
+
+    def getall(self, name):
+        '''A list of the values of every argument with this name'''
+        self._sync()
+        items = self._items
+        return [items[i][1] for i in self._index.get(name, ())]
+
+    def items(self):
+        '''A list of (name, value) pairs in order'''
+        self._sync()
+        return [tuple(item) for item in self._items if item]
+
+    def keys(self):
+        '''A list of the names in order, including repeats'''
+        return [name for name, _ in self.items()]
+
+    def values(self):
+        '''A list of the values in order'''
+        return [value for _, value in self.items()]
+
+    def add(self, name, value=None):
+        '''Add an argument after all the others'''
+        self._sync()
+        self._index.setdefault(name, []).append(len(self._items))
+        self._items.append([name, value])
+        self._changed()
+
+    def __setitem__(self, name, value):
+        '''Replace the value of the first argument with this name, removing
+        any others, or add it if there is none'''
+        self._sync()
+        positions = self._index.get(name)
+        if positions is None:
+            return self.add(name, value)
+        items = self._items
+        items[positions[0]][1] = value
+        for position in positions[1:]:
+            items[position] = None
+        self._removed += len(positions) - 1
+        del positions[1:]
+        self._changed()
+
+    def __delitem__(self, name):
+        '''Remove every argument with this name'''
+        self._sync()
+        positions = self._index.pop(name)
+        for position in positions:
+            self._items[position] = None
+        self._removed += len(positions)
+        self._changed()
+
+    def pop(self, name, *default):
+        '''Remove every argument with this name, returning the first value'''
+        self._sync()
+        if name not in self._index:
+            if default:
+                return default[0]
+            raise KeyError(name)
+        result = self[name]
+        del self[name]
+        return result
+
+    def discard(self, name):
+        '''Remove every argument with this name, if there are any'''
+        self._sync()
+        if name in self._index:
+            del self[name]
+
+    def clear(self):
+        '''Remove all the arguments'''
+        self._sync()
+        self._items = []
+        self._index = {}
+        self._removed = 0
+        self._changed()
+
+    def __eq__(self, other):
+        if isinstance(other, ArgsView):
+            other = other.items()
+        return self.items() == list(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    __hash__ = None
+
+    def __str__(self):
+        return self.join()
+
+    def __repr__(self):
+        return '<url.ArgsView %r>' % (self.items(),)
+
+
+class URL(object):
+    '''
+    For more information on how and what we parse / sanitize:
+        http://tools.ietf.org/html/rfc1808.html
+    The more up-to-date RFC is this one:
+        http://www.ietf.org/rfc/rfc3986.txt
+    '''
+
+    # Via http://www.ietf.org/rfc/rfc3986.txt
+    GEN_DELIMS = ":/?#[]@"
+    SUB_DELIMS = "!$&'()*+,;="
+    ALPHA = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+    DIGIT = "0123456789"
+    UNRESERVED = ALPHA + DIGIT + "-._~"
+    RESERVED = GEN_DELIMS + SUB_DELIMS
+    PCHAR = UNRESERVED + SUB_DELIMS + ":@"
+    PATH = PCHAR + "/"
+    QUERY = PCHAR + "/?"
+    FRAGMENT = PCHAR + "/?"
+    USERINFO = UNRESERVED + SUB_DELIMS + ":"
+
+    PERCENT_ESCAPING_RE = re.compile('(%([a-fA-F0-9]{2})|.)', re.S)
+
+    # Keep instances small; there may be many millions of them in memory.
+    # The last is only ever set on lazily-parsed urls, until they're split.
+    __slots__ = ('_scheme', '_host', '_port', '_path', '_params', '_query',
+        '_fragment', '_userinfo', '_key', '_normal', '_args', '_raw')
+
+    @classmethod
+    def parse(cls, url, encoding, lazy=False):
+        '''Parse the provided url, and return a URL instance. If lazy, the
+        url is only split into its components as they're first needed'''
+        if lazy:
+            result = cls.__new__(cls)
+            result._raw = (url, encoding)
+            result._key = None
+            result._normal = None
+            result._args = None
+            return result
+
+        return cls.from_components(cls.components(url, encoding))
+
+    @classmethod
+    def from_components(cls, components):
+        '''Return a URL instance for the (scheme, host, port, path, params,
+        query, fragment, userinfo) of a url, as components returns them'''
+        scheme, host, port, path, params, query, fragment, userinfo = (
+            components)
+        # The components are already the native string type, so this skips
+        # the conversions that __init__ makes
+        result = cls.__new__(cls)
+        result._scheme = cls.shared(scheme)
+        result._host = cls.shared(host)
+        result._port = port
+        result._path = path or '/'
+        result._params = cls.clean_params(params)
+        result._query = cls.clean_query(query)
+        result._fragment = fragment
+        result._userinfo = userinfo
+        result._key = None
+        result._normal = None
+        result._args = None
+        return result
+
+    # Which version is running is only checked once, here, rather than for
+    # every url
+    if sys.version_info[0] == 3:
+        @staticmethod
+        def components(url, encoding):
+            '''Decode, normalize and split the provided url into its (scheme,
+            host, port, path, params, query, fragment, userinfo)'''
+            if isinstance(url, bytes):
+                url = url.decode(encoding)
+            # Normalizing can't change a url that's all ASCII
+            if not is_ascii(url):
+                url = unicodenormalize('NFC', url)
+            # Nearly every url is scanned in a single pass, and the rest are
+            # left to urlparse
+            result = scan(url)
+            if result is None:
+                result = URL.split_result(urlparse(url))
+            return result
+
+        @staticmethod
+        def split(url, encoding):
+            '''Decode, normalize and split the provided url with urlparse'''
+            if isinstance(url, bytes):
+                url = url.decode(encoding)
+            # Normalizing can't change a url that's all ASCII
+            if not is_ascii(url):
+                url = unicodenormalize('NFC', url)
+            return urlparse(url)
+
+        @staticmethod
+        def native(value):
+            '''Convert a component to this version's native string type'''
+            if isinstance(value, bytes):
+                return value.decode('utf-8')
+            return value
+    else:
+        @staticmethod
+        def components(url, encoding):
+            '''Decode, normalize and split the provided url into its (scheme,
+            host, port, path, params, query, fragment, userinfo)'''
+            return URL.split_result(URL.split(url, encoding))
+
+        @staticmethod
+        def split(url, encoding):
+            '''Decode, normalize and split the provided url with urlparse'''
+            if isinstance(url, str):
+                url = url.decode(encoding)
+            # Normalizing can't change a url that's all ASCII
+            if not is_ascii(url):
+                url = unicodenormalize('NFC', url)
+            return urlparse(url.encode('utf-8'))
+
+        @staticmethod
+        def native(value):
+            '''Convert a component to this version's native string type'''
+            if isinstance(value, unicode_text):
+                return value.encode('utf-8')
+            return value
+
+    @staticmethod
+    def split_result(parsed):
+        '''The (scheme, host, port, path, params, query, fragment, userinfo)
+        of a urlparse result'''
+        host, port, userinfo = URL.split_netloc(parsed)
+        return (parsed.scheme, host, port, parsed.path, parsed.params,
+            parsed.query, parsed.fragment, userinfo)
+
+    @staticmethod
+    def split_netloc(parsed):
+        '''The (hostname, port, userinfo) of a urlparse result'''
+        netloc = parsed.netloc
+        # Most are a bare hostname, which is all there is to it
+        if not _NETLOC_SPECIAL.search(netloc):
+            return netloc.lower() or None, None, None
+        return (parsed.hostname, URL.split_port(parsed),
+            URL.split_userinfo(parsed))
+
+    @staticmethod
+    def split_port(parsed):
+        '''The port of a urlparse result, or None if it's invalid'''
+        try:
+            return parsed.port
+        except ValueError:
+            return None
+
+    @staticmethod
+    def split_userinfo(parsed):
+        '''The userinfo of a urlparse result'''
+        userinfo = parsed.username
+        if userinfo and parsed.password:
+            userinfo += ':%s' % parsed.password
+        return userinfo
+
+    @staticmethod
+    def shared(value):
+        '''Return the shared copy of a component that's likely to be repeated
+        across many urls, like the scheme or host'''
+        if not value:
+            return value
+        result = _shared.get(value)
+        if result is None:
+            _remember(_shared, SHARED_SIZE, value, value)
+            result = value
+        return result
+
+    @staticmethod
+    def clean_params(params):
+        '''Strip off leading, trailing and repeated ;'s'''
+        # Most params have none of those, and are left as they are
+        if not params or not _PARAMS_UNCLEAN.search(params):
+            return params
+        params = _PARAMS_LEADING.sub('', params)
+        return _PARAMS_ENDS.sub('', _PARAMS_REPEATED.sub(';', params))
+
+    @staticmethod
+    def clean_query(query):
+        '''Strip off extra leading ?'s and leading, trailing and repeated &'s'''
+        # Most queries have none of those, and are left as they are
+        if not query or not _QUERY_UNCLEAN.search(query):
+            return query
+        query = _QUERY_LEADING.sub('', query)
+        return _QUERY_ENDS.sub('', _QUERY_REPEATED.sub('&', query))
+
+    def __init__(self, scheme, host, port, path, params, query, fragment, userinfo=None):
+        native = self.native
+        self._scheme = self.shared(native(scheme))
+        self._host = self.shared(native(host))
+        self._port = port
+        self._path = native(path) or '/'
+        self._params = self.clean_params(native(params))
+        self._query = self.clean_query(native(query))
+        self._fragment = native(fragment)
+        self._userinfo = native(userinfo)
+        self._key = None
+        self._normal = None
+        self._args = None
+
+    ###########################################################################
+    # Lazily-parsed urls
+    ###########################################################################
+    # The slots of the components of a url
+    _COMPONENTS = frozenset(['_scheme', '_host', '_port', '_path', '_params',
+        '_query', '_fragment', '_userinfo'])
+
+    def _load(self):
+        '''Split a lazily-parsed url into all of its components at once. None
+        of them are set until then, since every method that changes one reads
+        it first.'''
+        url, encoding = self._raw
+        scheme, host, port, path, params, query, fragment, userinfo = (
+            self.components(url, encoding))
+        self._scheme = self.shared(scheme)
+        self._host = self.shared(host)
+        self._port = port
+        self._path = path or '/'
+        self._params = self.clean_params(params)
+        self._query = self.clean_query(query)
+        self._fragment = fragment
+        self._userinfo = userinfo
+        # Every component is set from now on
+        del self._raw
+
+    def __getattr__(self, name):
+        '''Only called for attributes that haven't been set, which is the case
+        for the components of a lazily-parsed url until they're first used'''
+        if name not in URL._COMPONENTS:
+            raise AttributeError(name)
+        # The query or params may also be unset because a view of them was
+        # edited, in which case they're joined back together
+        views = self._args
+        if views is not None:
+            view = views.get(name)
+            if view is not None and view._dirty:
+                setattr(self, name, view._load())
+                return object.__getattribute__(self, name)
+        # Raises AttributeError if this wasn't a lazily-parsed url after all,
+        # or has already been split
+        self._load()
+        return object.__getattribute__(self, name)
+
+    ###########################################################################
+    # Read-only access to the components
+    ###########################################################################
+    @property
+    def scheme(self):
+        return self._scheme
+
+    @property
+    def userinfo(self):
+        return self._userinfo
+
+    @property
+    def host(self):
+        return self._host
+
+    @property
+    def port(self):
+        return self._port
+
+    @property
+    def netloc(self):
+        netloc = self._host or ''
+        if self._port:
+            netloc += (':' + str(self._port))
+
+        if self._userinfo is not None:
+            netloc = '%s@%s' % (self._userinfo, netloc)
+        return netloc
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def params(self):
+        return self._params
+
+    @property
+    def query(self):
+        return self._query
+
+    @property
+    def fragment(self):
+        return self._fragment
+
+    ###########################################################################
+    # Dictionary-style access to the arguments
+    ###########################################################################
+    @property
+    def query_args(self):
+        '''An ordered multi-dict view (ArgsView) of the query arguments'''
+        return self._view('_query', '&')
+
+    @property
+    def param_args(self):
+        '''An ordered multi-dict view (ArgsView) of the params'''
+        return self._view('_params', ';')
+
+    def _view(self, attr, separator):
+        '''Return the view of a component, creating it if need be'''
+        views = self._args
+        if views is None:
+            views = self._args = {}
+        view = views.get(attr)
+        if view is None:
+            view = views[attr] = ArgsView(self, attr, separator)
+        return view
+
+    def _equivalent(self):
+        '''Return a copy of this url normalized the way `equiv` compares them'''
+        result = self.parse(str(self), 'utf-8')
+        result.canonical().defrag().abspath().escape()
+        if result._host:
+            result.punycode()
+        # An explicit default port is the same as no port at all
+        if result._port and result._port == PORTS.get(result._scheme):
+            result._port = None
+        return result
+
+    def equiv_key(self):
+        '''Return the tuple of normalized components that `equiv` compares.
+        It's computed once and then cached until one of them changes.'''
+        cached = self._key
+        if cached is not None:
+            scheme, host, port, path, params, query, key = cached
+            if (port is self._port and scheme is self._scheme and
+                    host is self._host and path is self._path and
+                    params is self._params and query is self._query):
+                return key
+
+        normal = self._equivalent()
+        # Ordered so that comparisons bail out on the cheapest mismatch first
+        key = (normal._port, normal._scheme, self.shared(normal._host),
+            normal._params, normal._query, normal._path)
+        self._key = (self._scheme, self._host, self._port, self._path,
+            self._params, self._query, key)
+        return key
+
+    def equiv(self, other):
+        '''Return true if this url is equivalent to another'''
+        if isinstance(other, string_type):
+            other = self.parse(other, 'utf-8')
+        elif not isinstance(other, URL):
+            other = self.parse(str(other), 'utf-8')
+        return self.equiv_key() == other.equiv_key()
+
+    def fingerprint(self, size=8):
+        '''Return a `size`-byte integer digest of this url, such that urls
+        that are `equiv` have the same fingerprint'''
+        if not 0 < size <= 16:
+            raise ValueError('Fingerprint size must be between 1 and 16 bytes')
+        port, scheme, host, params, query, path = self.equiv_key()
+        netloc = host or ''
+        if port:
+            netloc += ':%d' % port
+        normal = urlunparse((scheme, netloc, path, params, query, ''))
+        if sys.version_info[0] == 3:
+            normal = normal.encode('utf-8')
+        digest = hashlib.md5(normal).hexdigest()
+        return int(digest[:2 * size], 16)
+
+    def __eq__(self, other):
+        '''Return true if this url is /exactly/ equal to another'''
+        if isinstance(other, string_type):
+            return self.__eq__(self.parse(other, 'utf-8'))
+        return (
+            self._scheme   == other._scheme   and
+            self._host     == other._host     and
+            self._path     == other._path     and
+            self._port     == other._port     and
+            self._params   == other._params   and
+            self._query    == other._query    and
+            self._fragment == other._fragment and
+            self._userinfo == other._userinfo)
+
+    def __hash__(self):
+        # Hashes the url's own string, since __eq__ also compares equal to
+        # strings: str(url) finds the url in a set or dict, though other
+        # spellings that parse the same way don't. Methods like defrag()
+        # change a url in place, so a url mustn't be changed while it's hashed;
+        # fingerprint() is for deduplicating.
+        return hash(str(self))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __str__(self):
+        netloc = self.netloc
+        result = urlunparse((self._scheme, netloc, self._path, self._params,
+                            self._query, self._fragment))
+        return result
+
+    def __repr__(self):
+        return '<url.URL object "%s" >' % str(self)
+
+    def _normalized(self, index, value, function, *args):
+        '''Return function(value, *args), unless value is already known to be
+        normalized that way. Which values are known to be normalized is kept
+        by identity, so a component that changes in any way is normalized
+        again, and is left untouched if normalizing doesn't change it.'''
+        normal = self._normal
+        if normal is None:
+            normal = self._normal = [None] * _STATES
+        elif normal[index] is value:
+            return value
+        result = function(value, *args)
+        if result == value:
+            result = value
+        normal[index] = result
+        return result
+
+    def copy(self):
+        '''Return an independent copy of this url'''
+        result = URL.__new__(self.__class__)
+        result._scheme = self._scheme
+        result._host = self._host
+        result._port = self._port
+        result._path = self._path
+        result._params = self._params
+        result._query = self._query
+        result._fragment = self._fragment
+        result._userinfo = self._userinfo
+        result._key = self._key
+        if self._normal is not None:
+            result._normal = list(self._normal)
+        else:
+            result._normal = None
+        # Any argument views belong to this url, not the copy
+        result._args = None
+        return result
+
+    def canonical(self):
+        '''Canonicalize this url. This includes reordering parameters and args
+        to have a consistent ordering'''
+        self._query = self._normalized(
+            _CANONICAL + _QUERY, self._query, self.sort_args, '&')
+        self._params = self._normalized(
+            _CANONICAL + _PARAMS, self._params, self.sort_args, ';')
+        return self
+
+    @staticmethod
+    def sort_args(args, separator):
+        '''Sort the separated arguments of a query or params string'''
+        return separator.join(sorted(args.split(separator)))
+
+    def defrag(self):
+        '''Remove the fragment from this url'''
+        # Reading it first splits a lazily-parsed url, which would otherwise
+        # put the fragment back when it's split later
+        if self._fragment is not None:
+            self._fragment = None
+        return self
+
+    def deparam(self, params):
+        '''Strip any of the provided parameters out of the url. They're
+        either a list of names, or a ParamFilter.'''
+        if not isinstance(params, ParamFilter):
+            params = self.param_filter(params)
+        self._query = params(self._query, '&')
+        self._params = params(self._params, ';')
+        return self
+
+    # ParamFilters for each list of names passed to deparam, built as needed
+    _filters = {}
+
+    # How many of them to keep
+    FILTERS_SIZE = 1000
+
+    @staticmethod
+    def param_filter(names):
+        '''Return the ParamFilter for exactly the provided names'''
+        names = tuple(names)
+        result = URL._filters.get(names)
+        if result is None:
+            result = ParamFilter(names, glob=False)
+            _remember(URL._filters, URL.FILTERS_SIZE, names, result)
+        return result
+
+    def filter_params(self, function):
+        '''Remove parameters if function(name, value)'''
+        def keep(query):
+            name, _, value = query.partition('=')
+            return not function(name, value)
+        self._query = '&'.join(q for q in self._query.split('&') if q and keep(q))
+        self._params = ';'.join(q for q in self._params.split(';') if q and keep(q))
+        return self
+
+    def deuserinfo(self):
+        '''Remove any userinfo'''
+        # Read first, for lazily-parsed urls, as in defrag
+        if self._userinfo is not None:
+            self._userinfo = None
+        return self
+
+    def abspath(self):
+        '''Clear out any '..' and excessive slashes from the path'''
+        self._path = self._normalized(_ABSPATH, self._path, self.normpath)
+        return self
+
+    @staticmethod
+    def normpath(path):
+        '''Clear out any '..' and excessive slashes from a path'''
+        # Without any double slashes or dot segments, there's nothing to do
+        if '//' not in path and '/.' not in path and not path.startswith('.'):
+            return path
+        # Remove double forward-slashes from the path
+        path = re.sub(r'\/{2,}', '/', path)
+        # With that done, go through and remove all the relative references
+        unsplit = []
+        directory = False
+        for part in path.split('/'):
+            # If we encounter the parent directory, and there's
+            # a segment to pop off, then we should pop it off.
+            if part == '..' and (not unsplit or unsplit.pop() != None):
+                directory = True
+            elif part != '.':
+                unsplit.append(part)
+                directory = False
+            else:
+                directory = True
+
+        # With all these pieces, assemble!
+        if directory:
+            # If the path ends with a period, then it refers to a directory,
+            # not a file path
+            return '/'.join(unsplit) + '/'
+        else:
+            return '/'.join(unsplit)
+
+    def sanitize(self):
+        '''A shortcut to abspath and escape'''
+        return self.abspath().escape()
+
+    # Percent encoders for each set of safe characters, built as needed
+    _encoders = {}
+
+    @staticmethod
+    def encoder(safe):
+        '''Return the PercentEncoder for the provided safe characters'''
+        encoder = URL._encoders.get(safe)
+        if encoder is None:
+            encoder = URL._encoders[safe] = PercentEncoder(safe, URL.RESERVED)
+        return encoder
+
+    @staticmethod
+    def percent_encode(raw, safe):
+        '''Escape any characters of raw that aren't in safe, and normalize any
+        existing escapes, unescaping them where that's safe to do'''
+        return URL.encoder(safe)(raw)
+
+    @staticmethod
+    def quote(raw, safe):
+        '''Escape raw the way `escape` does when it's not strict'''
+        # Nothing to unescape or escape in a string of only safe characters
+        if URL.encoder(safe).clean(raw):
+            return raw
+        return urlquote(urlunquote(raw), safe=safe)
+
+    def escape(self, strict=False):
+        '''Make sure that the path is correctly escaped'''
+        if strict:
+            encode, state = self.percent_encode, _STRICT
+        else:
+            encode, state = self.quote, _ESCAPED
+        # Safe characters taken from:
+        #    http://tools.ietf.org/html/rfc3986#page-50
+        self._path = self._normalized(
+            state + _PATH, self._path, encode, URL.PATH)
+        self._query = self._normalized(
+            state + _QUERY, self._query, encode, URL.QUERY)
+        # The safe characters for URL parameters seemed a little more vague.
+        # They are interpreted here as *pchar despite this page, since the
+        # updated RFC seems to offer no replacement
+        #    http://tools.ietf.org/html/rfc3986#page-54
+        self._params = self._normalized(
+            state + _PARAMS, self._params, encode, URL.QUERY)
+        if self._userinfo:
+            self._userinfo = self._normalized(
+                state + _USERINFO, self._userinfo, encode, URL.USERINFO)
+        return self
+
+    def unescape(self):
+        '''Unescape the path'''
+        self._path = urlunquote(self._path)
+        return self
+
+    def encode(self, encoding):
+        '''Return the url in an arbitrary encoding'''
+        if sys.version_info[0] == 3:
+            return str(self).encode(encoding)
+        else:
+            return str(self).decode('utf-8').encode(encoding)
+
+    def relative(self, path, encoding='utf-8'):
+        '''Evaluate the new path relative to the current url'''
+        if isinstance(path, byte_string):
+            path = path.decode(encoding)
+        path = unicodenormalize('NFC', path)
+        if sys.version_info[0] == 3:
+            newurl = urljoin(self.unicode(), path)
+        else:
+            newurl = urljoin(self.utf8(), path.encode('utf-8'))
+
+        return URL.parse(newurl, 'utf-8')
+
+    def punycode(self, uts46=False):
+        '''Convert to punycode hostname. With uts46, hosts that IDNA 2003
+        rejects are mapped leniently rather than raising UnicodeError.'''
+        if self._host:
+            self._host = self._normalized(_UTS46 if uts46 else _PUNYCODE,
+                self._host, to_ascii, uts46)
+            return self
+        raise TypeError('Cannot punycode a relative url (%s)' % repr(self))
+
+    def unpunycode(self, uts46=False):
+        '''Convert to an unpunycoded hostname. With uts46, labels that can't
+        be decoded are left as they are rather than raising UnicodeError.'''
+        if self._host:
+            self._host = to_unicode(self._host, uts46)
+            return self
+        raise TypeError('Cannot unpunycode a relative url (%s)' % repr(self))
+
+    ###########################################################################
+    # Information about the domain
+    ###########################################################################
+    def domain_parts(self):
+        '''Return the (subdomain, pld, tld) of the url all at once'''
+        if self._host:
+            return domain_parts(self._host)
+        return DomainParts('', '', '')
+
+    def pld(self):
+        '''Return the 'pay-level domain' of the url
+            (http://moz.com/blog/what-the-heck-should-we-call-domaincom)'''
+        if self._host:
+            return domain_parts(self._host)[1]
+        return ''
+
+    def tld(self):
+        '''Return the top-level domain of a url'''
+        if self._host:
+            return domain_parts(self._host)[2]
+        return ''
+
+    ###########################################################################
+    # Information about the type of url it is
+    ###########################################################################
+    def absolute(self):
+        '''Return True if this is a fully-qualified URL with a hostname and
+        everything'''
+        return bool(self._host)
+
+    ###########################################################################
+    # Get a string representation. These methods can't be chained, as they
+    # return strings
+    ###########################################################################
+    def unicode(self):
+        '''Return a unicode version of this url'''
+        if sys.version_info[0] == 3:
+            return str(self)
+        else:
+            return str(self).decode('utf-8')
+
+    def utf8(self):
+        '''Return a utf-8 version of this url'''
+        if sys.version_info[0] == 3:
+            return str(self).encode('utf-8')
+        else:
+            return str(self)
+
+
+# Imported last, since these are all built on URL
+from .pipeline import Pipeline, compile
+from .view import URLView, views
+from .columnar import Columns, parse_columns
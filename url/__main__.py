@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Normalize newline-delimited urls from stdin or files onto stdout.
+
+    python -m url --defrag --deparam utm_source,utm_medium --escape < urls.txt
+
+Operations are applied in the order they're given on the command line, and
+any lines that can't be parsed or normalized are reported to stderr (or the
+file given with --rejects) rather than stopping the run.'''
+
+import argparse
+import io
+import sys
+
+from url import InvalidURL, Pipeline
+from url import parallel, pipeline
+
+# Size of the read and write buffers for the url streams
+BUFFER_SIZE = 1 << 20
+
+
+class OperationAction(argparse.Action):
+    '''Append an operation to the shared chain, preserving flag order'''
+    def __init__(self, option_strings, dest, operation=None, **kwargs):
+        self.operation = operation
+        argparse.Action.__init__(self, option_strings, dest, **kwargs)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        operations = getattr(namespace, self.dest, None) or []
+        if self.operation == 'deparam':
+            operations.append(('deparam', values.split(',')))
+        elif self.operation == 'escape-strict':
+            operations.append(('escape', True))
+        elif self.operation.endswith('-uts46'):
+            operations.append((self.operation[:-6], True))
+        else:
+            operations.append(self.operation)
+        setattr(namespace, self.dest, operations)
+
+
+def parser():
+    '''Return the argument parser for the command line'''
+    result = argparse.ArgumentParser(prog='python -m url',
+        description='Normalize newline-delimited urls.')
+    result.add_argument('files', nargs='*', default=['-'],
+        help='Files to read urls from (default: stdin)')
+    result.add_argument('-o', '--output', default='-',
+        help='File to write normalized urls to (default: stdout)')
+    result.add_argument('--rejects', default=None,
+        help='File to report rejected lines to (default: stderr)')
+    result.add_argument('-j', '--processes', type=int, default=1,
+        help='Number of worker processes (default: 1)')
+    result.add_argument('--chunksize', type=int, default=5000,
+        help='Number of urls handed to a worker at a time')
+    result.add_argument('--encoding', default='utf-8',
+        help='Encoding of the input (default: utf-8)')
+
+    group = result.add_argument_group('operations',
+        'Applied to each url in the order given')
+    for operation in sorted(pipeline.OPERATIONS - set(['deparam'])):
+        group.add_argument('--' + operation, dest='operations', nargs=0,
+            action=OperationAction, operation=operation,
+            help='Apply URL.%s()' % operation)
+    group.add_argument('--escape-strict', dest='operations', nargs=0,
+        action=OperationAction, operation='escape-strict',
+        help='Apply URL.escape(strict=True)')
+    for operation in ('punycode', 'unpunycode'):
+        group.add_argument('--%s-uts46' % operation, dest='operations',
+            nargs=0, action=OperationAction, operation=operation + '-uts46',
+            help='Apply URL.%s(uts46=True)' % operation)
+    group.add_argument('--deparam', dest='operations', metavar='NAMES',
+        action=OperationAction, operation='deparam',
+        help='Apply URL.deparam() with a comma-separated list of names')
+    return result
+
+
+def open_input(path):
+    '''Open an input path (or '-' for stdin) for buffered binary reading'''
+    if path == '-':
+        stdin = getattr(sys.stdin, 'buffer', sys.stdin)
+        return io.open(stdin.fileno(), 'rb', BUFFER_SIZE, closefd=False)
+    return io.open(path, 'rb', BUFFER_SIZE)
+
+
+def open_output(path, default):
+    '''Open an output path (or '-' / None for the default stream) for
+    buffered binary writing'''
+    if path in ('-', None):
+        return io.open(default.fileno(), 'wb', BUFFER_SIZE, closefd=False)
+    return io.open(path, 'wb', BUFFER_SIZE)
+
+
+def lines(paths):
+    '''Yield every non-blank line from each of the paths in turn'''
+    for path in paths:
+        with open_input(path) as fin:
+            for line in fin:
+                if not line.isspace():
+                    yield line
+
+
+def results(urls, args):
+    '''Yield the normalized result (or InvalidURL) for each url'''
+    operations = args.operations or []
+    if args.processes > 1:
+        return parallel.normalize(urls, operations, args.processes,
+            args.chunksize, args.encoding, strip=True)
+
+    def serial():
+        pipeline = Pipeline(operations, args.encoding)
+        for chunk in parallel.chunks(urls, args.chunksize):
+            for result in parallel.normalize_chunk(
+                    chunk, pipeline, strip=True):
+                yield result
+    return serial()
+
+
+def main(argv=None):
+    args = parser().parse_args(argv)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    with open_output(args.output, sys.stdout) as fout:
+        with open_output(args.rejects, sys.stderr) as rejects:
+            for result in results(lines(args.files), args):
+                if isinstance(result, InvalidURL):
+                    raw = result.url
+                    if not isinstance(raw, bytes):
+                        raw = raw.encode('utf-8')
+                    rejects.write(raw + b'\t' +
+                        str(result.reason).encode('utf-8') + b'\n')
+                else:
+                    fout.write(result.encode('utf-8') + b'\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Normalize streams of urls from asyncio code without blocking the loop.
+
+Urls are handed off in chunks to an executor (the loop's default one, unless
+another is given), and normalized `URL` objects come back in input order:
+
+    async for parsed in url.aio.normalize(reader, ['defrag', 'escape'],
+            base=page_url):
+        ...
+
+Only a bounded number of urls are ever read ahead of the consumer, so a slow
+consumer holds up the source rather than filling up memory. This needs
+Python 3.6 or later, for async generators, and isn't imported by `url`.
+'''
+
+import asyncio
+from collections import deque
+from functools import partial
+
+from . import InvalidURL, URL, _check_errors
+from .pipeline import apply, chain
+
+# Marks the end of the source in the queue
+_END = object()
+
+
+def normalize_chunk(urls, operations, base=None, encoding='utf-8',
+                    errors='replace'):
+    '''Parse each of a list of raw urls (relative to base, if it's given) and
+    apply a validated operation chain, returning a list of URL objects (or
+    InvalidURL markers, depending on `errors`) in the same order'''
+    results = []
+    for raw in urls:
+        try:
+            if base is None:
+                parsed = URL.parse(raw, encoding)
+            else:
+                parsed = base.relative(raw, encoding)
+            results.append(apply(parsed, operations))
+        except (TypeError, ValueError) as exc:
+            if errors == 'strict':
+                raise InvalidURL(raw, exc)
+            elif errors == 'replace':
+                results.append(InvalidURL(raw, exc))
+    return results
+
+
+async def _read(source, queue):
+    '''Put each url from the source onto the queue, and then _END'''
+    try:
+        if isinstance(source, asyncio.StreamReader):
+            async for line in source:
+                line = line.rstrip(b'\r\n')
+                if line and not line.isspace():
+                    await queue.put(line)
+        elif hasattr(source, '__aiter__'):
+            async for raw in source:
+                await queue.put(raw)
+        else:
+            for raw in source:
+                await queue.put(raw)
+    except asyncio.CancelledError:
+        # The consumer has gone away, so there's no one left to tell
+        raise
+    except Exception:
+        await queue.put(_END)
+        raise
+    await queue.put(_END)
+
+
+async def normalize(source, operations=(), base=None, executor=None,
+                    chunksize=100, backlog=4, encoding='utf-8',
+                    errors='replace'):
+    '''Yield a normalized URL for each url from the source, in order.
+
+    The source is an async iterable of raw urls, a plain iterable of them, or
+    an asyncio.StreamReader of newline-delimited urls. Each url is parsed
+    relative to `base` (a URL or a string) if it's given, and then the
+    operation chain is applied to it, in chunks of up to `chunksize` urls on
+    the executor. At most `backlog` chunks are in the executor at a time, and
+    only as many urls as fit in them are read ahead. Bad urls are handled as
+    for `parse_many`.'''
+    if chunksize < 1 or backlog < 1:
+        raise ValueError('chunksize and backlog must be positive')
+    _check_errors(errors)
+    if base is not None and not isinstance(base, URL):
+        base = URL.parse(base, encoding)
+    function = partial(normalize_chunk, operations=chain(list(operations)),
+        base=base, encoding=encoding, errors=errors)
+
+    loop = asyncio.get_event_loop()
+    queue = asyncio.Queue(chunksize * backlog)
+    reader = asyncio.ensure_future(_read(source, queue))
+    pending = deque()
+    done = False
+    try:
+        while not done or pending:
+            # Hand off whatever has been read so far, only waiting for more
+            # when there's nothing else to wait for
+            while not done and len(pending) < backlog and (
+                    not pending or not queue.empty()):
+                chunk = []
+                raw = await queue.get()
+                while raw is not _END:
+                    chunk.append(raw)
+                    if len(chunk) >= chunksize or queue.empty():
+                        break
+                    raw = queue.get_nowait()
+                done = raw is _END
+                if chunk:
+                    pending.append(
+                        loop.run_in_executor(executor, function, chunk))
+            if pending:
+                for result in await pending.popleft():
+                    yield result
+        # Raises anything the source did
+        await reader
+    finally:
+        reader.cancel()
+        for future in pending:
+            # Nothing is left to see the results, or any exceptions
+            if future.done() and not future.cancelled():
+                future.exception()
+            future.cancel()
+
+
+async def normalize_many(urls, operations=(), base=None, executor=None,
+                         chunksize=100, encoding='utf-8', errors='replace'):
+    '''Return a list of normalized URLs for a list of raw urls, like all the
+    links on a page, normalized in chunks on the executor at once'''
+    results = []
+    async for result in normalize(urls, operations, base, executor,
+            chunksize, max(1, -(-len(urls) // chunksize)), encoding, errors):
+        results.append(result)
+    return results
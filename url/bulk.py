@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Normalize huge newline-delimited files of urls through a memory map.
+
+Rather than reading the file a line at a time through a file object, it's
+mapped into memory and each line is handed straight from the map to a compiled
+Pipeline, and the results are written a whole buffer at a time:
+
+    with open('urls.out', 'wb') as fout:
+        url.bulk.normalize('urls.txt', fout, ['defrag', 'abspath', 'escape'])
+
+A line belongs to whichever byte range it starts in, so a file can be split
+up with `ranges` and each range normalized by a different process, and a run
+can be resumed from the last offset given to its `checkpoint`.
+'''
+
+import mmap
+import os
+import re
+
+from . import InvalidURL
+from .pipeline import Pipeline
+
+# Bytes of output gathered up before each write
+BUFFER_SIZE = 1 << 22
+
+# Lines without the line ending (blank ones are skipped as they're found)
+_LINE = re.compile(b'[^\r\n]+')
+
+
+def _line_start(buffer, offset):
+    '''The offset of the first line that starts at or after offset'''
+    if offset <= 0:
+        return 0
+    if offset >= len(buffer) or buffer[offset - 1:offset] == b'\n':
+        return min(offset, len(buffer))
+    index = buffer.find(b'\n', offset)
+    if index < 0:
+        return len(buffer)
+    return index + 1
+
+
+def ranges(path, parts):
+    '''Split a file into at most `parts` (start, end) byte ranges, each of
+    which holds whole lines'''
+    if parts < 1:
+        raise ValueError('parts must be positive')
+    size = os.path.getsize(path)
+    if not size:
+        return []
+    with open(path, 'rb') as fin:
+        buffer = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            offsets = [0]
+            for part in range(1, parts):
+                offset = _line_start(buffer, size * part // parts)
+                if offset > offsets[-1]:
+                    offsets.append(offset)
+        finally:
+            buffer.close()
+    if offsets[-1] < size:
+        offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+
+def normalize_buffer(buffer, output, pipeline, start=0, end=None,
+                     rejects=None, checkpoint=None, buffer_size=BUFFER_SIZE):
+    '''Normalize the lines of a buffer of bytes that start between start and
+    end with a Pipeline whose output is 'utf8', writing each result to the
+    binary file `output`.
+    Returns the number of urls written.
+
+    Lines that can't be normalized are written to `rejects` along with the
+    reason if it's given, and otherwise raise InvalidURL. After each write,
+    checkpoint(offset, written) is called with the offset of the next line
+    to normalize and the number of bytes written to `output` so far.'''
+    if end is None:
+        end = len(buffer)
+    start = _line_start(buffer, start)
+    end = _line_start(buffer, end)
+
+    count = written = pending = 0
+    results = []
+    for line in _LINE.finditer(buffer, start, end):
+        if not line.group().strip():
+            continue
+        try:
+            result = pipeline(line.group())
+        except (TypeError, ValueError) as exc:
+            if rejects is None:
+                raise InvalidURL(line.group(), exc)
+            rejects.write(
+                line.group() + b'\t' + str(exc).encode('utf-8') + b'\n')
+            continue
+        results.append(result)
+        pending += len(result) + 1
+        count += 1
+        if pending >= buffer_size:
+            results.append(b'')
+            output.write(b'\n'.join(results))
+            written += pending
+            results = []
+            pending = 0
+            if checkpoint is not None:
+                checkpoint(_line_start(buffer, line.end()), written)
+
+    if results:
+        results.append(b'')
+        output.write(b'\n'.join(results))
+        written += pending
+    if checkpoint is not None:
+        checkpoint(end, written)
+    return count
+
+
+def normalize(path, output, operations, start=0, end=None, encoding='utf-8',
+              rejects=None, checkpoint=None, buffer_size=BUFFER_SIZE):
+    '''Normalize the lines of the file at path that start between start and
+    end, writing them utf-8 encoded to the binary file `output`. Returns the
+    number of urls written. See normalize_buffer.'''
+    pipeline = Pipeline(operations, encoding, 'utf8')
+    if not os.path.getsize(path):
+        # Empty files can't be mapped
+        return 0
+    with open(path, 'rb') as fin:
+        buffer = mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return normalize_buffer(buffer, output, pipeline, start, end,
+                rejects, checkpoint, buffer_size)
+        finally:
+            buffer.close()
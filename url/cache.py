@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''A bounded, least-recently-used cache of parse and normalization results.
+
+The same links turn up over and over again in crawl data, so it can pay to
+remember what they parse and normalize to. Since URL objects are mutable, the
+cache only ever hands out copies of the URLs it holds, and normalized results
+are plain (immutable) strings.'''
+
+from collections import namedtuple, OrderedDict
+
+from . import URL
+from .pipeline import Pipeline, chain
+
+CacheInfo = namedtuple('CacheInfo',
+    ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+# Marks a cache miss, since None is a perfectly good cached value
+_missing = object()
+
+
+class Cache(object):
+    '''An LRU cache of at most `maxsize` parse and normalization results'''
+
+    def __init__(self, maxsize=100000):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+        self.maxsize = maxsize
+        # Each distinct operation chain gets a small integer to key entries
+        # with, which is much cheaper to hash than the chain itself
+        self._chains = {}
+        self.clear()
+
+    def clear(self):
+        '''Forget all cached results and reset the statistics'''
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def info(self):
+        '''Return the hit, miss and eviction statistics for this cache'''
+        return CacheInfo(self.hits, self.misses, self.evictions,
+            self.maxsize, len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, function, *args):
+        '''Return the cached value for key, computing it with function(*args)
+        if it's not already cached'''
+        entries = self._entries
+        value = entries.pop(key, _missing)
+        if value is _missing:
+            self.misses += 1
+            value = function(*args)
+            if len(entries) >= self.maxsize:
+                entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.hits += 1
+        # Either way, this is now the most recently used entry
+        entries[key] = value
+        return value
+
+    def parse(self, url, encoding='utf-8'):
+        '''Like `url.parse`, returning a copy of any cached URL'''
+        return self.get((None, url, encoding), URL.parse, url, encoding).copy()
+
+    def normalizer(self, operations):
+        '''Return a function that parses a url, applies the operation chain
+        (as described in `url.pipeline.chain`) and returns a unicode string,
+        with the results held in this cache'''
+        operations = list(operations)
+        ident = self._chains.setdefault(chain(operations), len(self._chains))
+        # The chain is compiled once for each encoding it's used with
+        pipelines = {}
+
+        def normalize(url, encoding='utf-8'):
+            pipeline = pipelines.get(encoding)
+            if pipeline is None:
+                pipeline = pipelines[encoding] = Pipeline(operations, encoding)
+            return self.get((ident, url, encoding), pipeline, url)
+        return normalize
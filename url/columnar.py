@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Parse batches of urls into columns rather than URL objects.
+
+For aggregating over lots of urls, a URL object apiece is mostly overhead.
+`parse_columns` instead returns a column per component. The scheme, host and
+pld are dictionary-encoded: each of those columns is an array of integer codes
+into a table of the distinct values, and the pld is only looked up once per
+distinct host:
+
+    columns = url.parse_columns(urls)
+    columns.counts('pld')  # {'example.com': 1200, ...}
+
+The code columns are `array.array`s, which NumPy can use without a copy.
+'''
+
+from array import array
+from collections import Counter
+
+from . import InvalidURL, URL, _check_errors, domain_parts
+
+# The dictionary-encoded columns, and the names of their tables
+ENCODED = {'scheme': 'schemes', 'host': 'hosts', 'pld': 'plds'}
+
+
+class Columns(object):
+    '''The components of a batch of urls, a column each.
+
+    scheme, host and pld are arrays of codes into the schemes, hosts and plds
+    tables of distinct values, and host_pld holds the pld code of each host.
+    port is an array with -1 for urls without one, and path and query are
+    lists of strings. The indexes of any invalid urls are in invalid.'''
+
+    def __init__(self, schemes, scheme, hosts, host, plds, host_pld, port,
+                 path, query, invalid):
+        self.schemes = schemes
+        self.scheme = scheme
+        self.hosts = hosts
+        self.host = host
+        self.plds = plds
+        self.host_pld = host_pld
+        self.port = port
+        self.path = path
+        self.query = query
+        self.invalid = invalid
+        self._pld = None
+
+    @property
+    def pld(self):
+        '''The pld code of each url, from the code of its host'''
+        if self._pld is None:
+            host_pld = self.host_pld
+            self._pld = array('i', [host_pld[code] for code in self.host])
+        return self._pld
+
+    def __len__(self):
+        return len(self.path)
+
+    def row(self, index):
+        '''Return the (scheme, host, port, path, query, pld) of one url'''
+        host = self.host[index]
+        port = self.port[index]
+        return (self.schemes[self.scheme[index]], self.hosts[host],
+            None if port < 0 else port, self.path[index], self.query[index],
+            self.plds[self.host_pld[host]])
+
+    def counts(self, name):
+        '''Return a dict of the number of urls with each distinct value of one
+        of the encoded columns'''
+        if name not in ENCODED:
+            raise ValueError('Not an encoded column: %r' % name)
+        values = getattr(self, ENCODED[name])
+        if name == 'pld':
+            # Counted by host, and then added up by the pld of each host
+            host_pld = self.host_pld
+            values = [values[code] for code in host_pld]
+            codes = self.host
+        else:
+            codes = getattr(self, name)
+        result = {}
+        for code, count in Counter(codes).items():
+            value = values[code]
+            result[value] = result.get(value, 0) + count
+        return result
+
+    def to_numpy(self):
+        '''Return a dict of NumPy arrays of the scheme, host, pld, host_pld
+        and port columns, which share memory with the columns here'''
+        import numpy
+        return dict((name, numpy.frombuffer(getattr(self, name), numpy.intc))
+            for name in ('scheme', 'host', 'pld', 'host_pld', 'port'))
+
+
+def parse_columns(urls, encoding='utf-8', errors='replace'):
+    '''Parse an iterable of urls into Columns.
+
+    Inputs that cannot be parsed are handled according to `errors`, as for
+    `parse_many`, except that 'replace' keeps an empty row and lists its index
+    in `invalid`.'''
+    _check_errors(errors)
+    components = URL.components
+    clean_query = URL.clean_query
+    scheme_codes = {}
+    host_codes = {}
+    scheme_column = array('i')
+    host_column = array('i')
+    port_column = array('i')
+    paths = []
+    queries = []
+    invalid = []
+    for raw in urls:
+        try:
+            scheme, host, port, path, _, query, _, _ = components(
+                raw, encoding)
+        except (TypeError, ValueError) as exc:
+            if errors == 'strict':
+                raise InvalidURL(raw, exc)
+            elif errors == 'ignore':
+                continue
+            invalid.append(len(paths))
+            scheme, host, port, path, query = '', None, None, '', ''
+        else:
+            path = path or '/'
+            query = clean_query(query)
+
+        code = scheme_codes.get(scheme)
+        if code is None:
+            code = scheme_codes[scheme] = len(scheme_codes)
+        scheme_column.append(code)
+        code = host_codes.get(host)
+        if code is None:
+            code = host_codes[host] = len(host_codes)
+        host_column.append(code)
+        port_column.append(-1 if port is None else port)
+        paths.append(path)
+        queries.append(query)
+
+    schemes = sorted(scheme_codes, key=scheme_codes.get)
+    hosts = sorted(host_codes, key=host_codes.get)
+    # Each distinct host only has its pld looked up the once
+    pld_codes = {}
+    host_pld = array('i')
+    for host in hosts:
+        pld = domain_parts(host)[1] if host else ''
+        code = pld_codes.get(pld)
+        if code is None:
+            code = pld_codes[pld] = len(pld_codes)
+        host_pld.append(code)
+    plds = sorted(pld_codes, key=pld_codes.get)
+    return Columns(schemes, scheme_column, hosts, host_column, plds,
+        host_pld, port_column, paths, queries, invalid)
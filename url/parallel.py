@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Normalize large numbers of urls over a pool of worker processes.
+
+Each worker imports `url` (and so loads the public suffix list) once, and is
+then handed whole chunks of raw urls at a time, so the per-url overhead of
+shipping work between processes stays small.'''
+
+from collections import deque
+from itertools import islice
+from multiprocessing import cpu_count
+
+try:
+    from concurrent.futures import ProcessPoolExecutor
+except ImportError:
+    # Python 2 without the `futures` backport
+    ProcessPoolExecutor = None
+
+from . import InvalidURL, _check_errors
+from .pipeline import Pipeline
+
+
+def normalize_chunk(urls, pipeline, errors='replace', strip=False):
+    '''Normalize a list of raw urls with a Pipeline, returning a list of
+    unicode urls (or InvalidURL markers, depending on `errors`) in the same
+    order'''
+    if strip:
+        urls = [u.rstrip(b'\r\n' if isinstance(u, bytes) else u'\r\n')
+            for u in urls]
+    results = []
+    for raw in urls:
+        try:
+            results.append(pipeline(raw))
+        except (TypeError, ValueError) as exc:
+            if errors == 'strict':
+                raise InvalidURL(raw, exc)
+            elif errors == 'replace':
+                results.append(InvalidURL(raw, exc))
+    return results
+
+
+def chunks(iterable, size):
+    '''Yield lists of at most `size` items from iterable'''
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def normalize(urls, operations, processes=None, chunksize=1000,
+              encoding='utf-8', errors='replace', strip=False):
+    '''Apply the operation chain to every url in the iterable using a pool of
+    `processes` workers, yielding unicode urls in input order.
+
+    The input is consumed lazily: only a bounded number of chunks of
+    `chunksize` urls are ever in flight. Bad urls are handled according to
+    `errors`, as for `parse_many`.'''
+    if ProcessPoolExecutor is None:
+        raise RuntimeError('url.parallel requires concurrent.futures')
+    if chunksize < 1:
+        raise ValueError('chunksize must be positive')
+    _check_errors(errors)
+    # Compiled (and so validated) once, and shipped to the workers
+    pipeline = Pipeline(operations, encoding)
+    processes = processes or cpu_count()
+
+    with ProcessPoolExecutor(processes) as pool:
+        # Enough chunks in flight to keep every worker busy while we're
+        # handing results back to the caller
+        backlog = 2 * processes
+        pending = deque()
+        for chunk in chunks(urls, chunksize):
+            pending.append(pool.submit(
+                normalize_chunk, chunk, pipeline, errors, strip))
+            if len(pending) >= backlog:
+                for result in pending.popleft().result():
+                    yield result
+        while pending:
+            for result in pending.popleft().result():
+                yield result
+
+
+def normalize_file(path, operations, **kwargs):
+    '''Like `normalize`, but reads newline-delimited urls from a file'''
+    kwargs['strip'] = True
+    with open(path, 'rb') as fin:
+        for result in normalize(fin, operations, **kwargs):
+            yield result
@@ -0,0 +1,265 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Normalization pipelines compiled once and applied to raw urls.
+
+A chain like `parse(u).defrag().abspath().escape().unicode()` builds a URL
+object, and every step goes through its methods. A `Pipeline` validates the
+same chain of operations up front, and then works on the bare components of
+each url, skipping steps that have nothing to do and joining the components
+back together exactly once:
+
+    normalize = url.compile(['defrag', 'abspath', 'escape'])
+    normalize(b'http://foo.com/a/../b c#frag')  # u'http://foo.com/b%20c'
+'''
+
+import sys
+
+from . import ParamFilter, URL, to_ascii, to_unicode, urlunparse, urlunquote
+
+# The URL methods that may appear in an operation chain
+OPERATIONS = frozenset([
+    'abspath', 'canonical', 'defrag', 'deparam', 'deuserinfo', 'escape',
+    'punycode', 'sanitize', 'unescape', 'unpunycode'])
+
+# Operations that leave a url alone when applied a second time in a row
+IDEMPOTENT = frozenset([
+    'abspath', 'canonical', 'defrag', 'deparam', 'deuserinfo', 'escape',
+    'punycode'])
+
+# The (fewest, most) arguments of each operation that takes any
+ARGUMENTS = {
+    'deparam': (1, 1),
+    'escape': (0, 1),
+    'punycode': (0, 1),
+    'unpunycode': (0, 1)
+}
+
+# Indexes into the list of components each step works on
+_SCHEME, _HOST, _PORT, _PATH, _PARAMS, _QUERY, _FRAGMENT, _USERINFO = range(8)
+
+
+def chain(operations):
+    '''Validate an operation chain, returning it as a tuple of (name, args).
+
+    Each operation is either the name of a URL method, or a tuple of the name
+    followed by its arguments, like `('deparam', ['utm_source'])`. Any list
+    arguments become tuples, so that the result is hashable.'''
+    result = []
+    for operation in operations:
+        if isinstance(operation, (tuple, list)):
+            name, args = operation[0], tuple(
+                tuple(arg) if isinstance(arg, list) else arg
+                for arg in operation[1:])
+        else:
+            name, args = operation, ()
+        if name not in OPERATIONS:
+            raise ValueError('Unknown operation %r' % (name,))
+        fewest, most = ARGUMENTS.get(name, (0, 0))
+        if not fewest <= len(args) <= most:
+            raise ValueError('Operation %r takes %s argument(s), not %d' % (
+                name, fewest if fewest == most else '%d to %d' % (fewest, most),
+                len(args)))
+        result.append((name, args))
+    return tuple(result)
+
+
+def apply(parsed, operations):
+    '''Apply a validated operation chain to a URL object'''
+    for name, args in operations:
+        parsed = getattr(parsed, name)(*args)
+    return parsed
+
+
+def _abspath():
+    normpath = URL.normpath
+
+    def step(components):
+        components[_PATH] = normpath(components[_PATH])
+    return step
+
+
+def _canonical():
+    sort_args = URL.sort_args
+
+    def step(components):
+        # A single argument is already in order
+        if '&' in components[_QUERY]:
+            components[_QUERY] = sort_args(components[_QUERY], '&')
+        if ';' in components[_PARAMS]:
+            components[_PARAMS] = sort_args(components[_PARAMS], ';')
+    return step
+
+
+def _defrag():
+    def step(components):
+        components[_FRAGMENT] = None
+    return step
+
+
+def _deparam(params):
+    if not isinstance(params, ParamFilter):
+        params = URL.param_filter(params)
+
+    def step(components):
+        components[_QUERY] = params(components[_QUERY], '&')
+        components[_PARAMS] = params(components[_PARAMS], ';')
+    return step
+
+
+def _deuserinfo():
+    def step(components):
+        components[_USERINFO] = None
+    return step
+
+
+def _escape(strict=False):
+    if strict:
+        path, query, userinfo = (URL.encoder(safe)
+            for safe in (URL.PATH, URL.QUERY, URL.USERINFO))
+    else:
+        quote = URL.quote
+        path, query, userinfo = (
+            lambda raw, safe=safe: quote(raw, safe)
+            for safe in (URL.PATH, URL.QUERY, URL.USERINFO))
+
+    def step(components):
+        components[_PATH] = path(components[_PATH])
+        if components[_QUERY]:
+            components[_QUERY] = query(components[_QUERY])
+        if components[_PARAMS]:
+            components[_PARAMS] = query(components[_PARAMS])
+        if components[_USERINFO]:
+            components[_USERINFO] = userinfo(components[_USERINFO])
+    return step
+
+
+def _punycode(uts46=False):
+    def step(components):
+        if not components[_HOST]:
+            raise TypeError('Cannot punycode a relative url')
+        components[_HOST] = to_ascii(components[_HOST], uts46)
+    return step
+
+
+def _unescape():
+    def step(components):
+        components[_PATH] = urlunquote(components[_PATH])
+    return step
+
+
+def _unpunycode(uts46=False):
+    def step(components):
+        if not components[_HOST]:
+            raise TypeError('Cannot unpunycode a relative url')
+        components[_HOST] = to_unicode(components[_HOST], uts46)
+    return step
+
+
+# Build the step function for each operation from its arguments
+_STEPS = {
+    'abspath': _abspath,
+    'canonical': _canonical,
+    'defrag': _defrag,
+    'deparam': _deparam,
+    'deuserinfo': _deuserinfo,
+    'escape': _escape,
+    'punycode': _punycode,
+    'unescape': _unescape,
+    'unpunycode': _unpunycode
+}
+
+
+class Pipeline(object):
+    '''A chain of operations (as described in `chain`), compiled into a
+    function from a raw url (unicode or bytes) to its normalized form. The
+    result is the same as that of applying the chain to `url.parse(raw)` and
+    calling its `unicode()`, `utf8()` or `str()`, depending on `output`.'''
+
+    def __init__(self, operations, encoding='utf-8', output='unicode'):
+        if output not in ('unicode', 'utf8', 'str'):
+            raise ValueError('Unknown output %r' % (output,))
+        self.operations = chain(operations)
+        self.encoding = encoding
+        self.output = output
+        self._steps = [_STEPS[name](*args) for name, args in self.plan()]
+
+    def plan(self):
+        '''Return the operations as they'll actually be applied: shortcuts
+        are expanded, and repeats of operations that are already done are
+        dropped, just as URL methods skip components they've normalized.'''
+        result = []
+        for name, args in self.operations:
+            if name == 'sanitize':
+                expanded = [('abspath', ()), ('escape', ())]
+            else:
+                expanded = [(name, args)]
+            for operation in expanded:
+                if (operation[0] in IDEMPOTENT and result and
+                        result[-1] == operation):
+                    continue
+                result.append(operation)
+        return tuple(result)
+
+    def components(self, url):
+        '''Split a raw url into the list of components the steps work on'''
+        components = list(URL.components(url, self.encoding))
+        components[_PATH] = components[_PATH] or '/'
+        components[_PARAMS] = URL.clean_params(components[_PARAMS])
+        components[_QUERY] = URL.clean_query(components[_QUERY])
+        return components
+
+    def __call__(self, url):
+        components = self.components(url)
+        for step in self._steps:
+            step(components)
+        scheme, host, port, path, params, query, fragment, userinfo = (
+            components)
+        netloc = host or ''
+        if port:
+            netloc += ':' + str(port)
+        if userinfo is not None:
+            netloc = '%s@%s' % (userinfo, netloc)
+        result = urlunparse((scheme, netloc, path, params, query, fragment))
+        if self.output == 'str':
+            return result
+        if sys.version_info[0] == 3:
+            if self.output == 'utf8':
+                return result.encode('utf-8')
+            return result
+        if self.output == 'unicode':
+            return result.decode('utf-8')
+        return result
+
+    def __reduce__(self):
+        # The steps are closures, so pickle the chain and compile it again
+        operations = [(name,) + args for name, args in self.operations]
+        return (Pipeline, (operations, self.encoding, self.output))
+
+    def __repr__(self):
+        return '<url.Pipeline %r>' % (list(self.operations),)
+
+
+def compile(operations, encoding='utf-8', output='unicode'):
+    '''Return a Pipeline for the provided chain of operations'''
+    return Pipeline(operations, encoding, output)
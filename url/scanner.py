@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''A single-pass scanner for the urls that make up nearly all crawl data.
+
+`urlparse` splits a url into five or six pieces, and each of the `hostname`,
+`port`, `username` and `password` properties then splits the netloc all over
+again (and `port` may raise). Here a single regular expression finds every
+component boundary at once.
+
+Only urls that every supported version of `urlparse` treats the same way are
+scanned: those with a `scheme://` or `//` authority, or an absolute path, with
+a netloc holding no IPv6 brackets, escapes or odd ports, and without the
+control characters that newer versions strip out. For anything else `scan`
+returns None, and `urlparse` is the authority.'''
+
+import re
+import sys
+import unicodedata
+
+try:
+    from urllib.parse import uses_params
+except ImportError:
+    from urlparse import uses_params
+
+# Schemes whose paths may have ;params, just as for urlparse
+PARAMS_SCHEMES = frozenset(uses_params)
+
+# Characters that may not appear in any part of the netloc. Any of them (like
+# brackets, which urlparse checks for balance) means the url is left to it.
+_NETLOC = u'\\x00-\\x20\\x7f/?#\\[\\]'
+_PATTERN = u'''
+    (?:([A-Za-z][A-Za-z0-9+.\\-]*):(?=//))?   # scheme, only with an authority
+    (?:
+        //
+        (                                     # netloc
+        (?:([^%(netloc)s]*)@)?                # userinfo, up to the last @
+        ([^%(netloc)s@:%%]*)                  # host
+        (?::([0-9]*))?                        # port
+        )
+        (?=[/?\\#]|\\Z)
+    |
+        (?=/(?!/))                            # otherwise, an absolute path
+    )
+    ([^?\\#\\t\\r\\n%(text)s]*)               # path and params
+    (?:\\?([^\\#\\t\\r\\n%(text)s]*))?        # query
+    (?:\\#([^\\t\\r\\n%(text)s]*))?           # fragment
+    \\Z'''
+_URL = re.compile(_PATTERN % {'netloc': _NETLOC, 'text': u''}, re.X)
+
+# The same, for ASCII urls in a buffer of bytes. Bytes that aren't ASCII may
+# need decoding and normalizing, so they're left to urlparse too.
+URL_BYTES = re.compile((_PATTERN % {
+    'netloc': _NETLOC + u'\\x80-\\xff', 'text': u'\\x80-\\xff'}).encode('ascii'),
+    re.X)
+
+_ascii = re.compile(u'[\\x00-\\x7f]*\\Z').match
+
+
+def _nfkc_delimiters(netloc):
+    '''Return True if NFKC normalization turns characters of the netloc
+    into delimiters, like \\u2100 into a/c'''
+    for c in u'@:#?':
+        netloc = netloc.replace(c, u'')
+    normalized = unicodedata.normalize('NFKC', netloc)
+    return normalized != netloc and any(c in normalized for c in u'/?#@:')
+
+
+def split_params(scheme, path):
+    '''Split the params off of a path, as urlparse does for this scheme'''
+    if ';' in path and scheme in PARAMS_SCHEMES:
+        # Only the last segment of the path has params
+        index = path.find(';', path.rfind('/'))
+        if index >= 0:
+            return path[:index], path[index + 1:]
+    return path, ''
+
+
+def port(digits):
+    '''The port for a string of digits, or None if there isn't a valid one'''
+    if digits:
+        result = int(digits)
+        if result <= 65535:
+            return result
+    return None
+
+
+def userinfo(raw):
+    '''The userinfo as urlparse's username and password would have it'''
+    if raw is not None:
+        username, _, password = raw.partition(':')
+        if username and password:
+            return username + ':' + password
+        return username
+    return None
+
+
+if sys.version_info[0] == 3:
+    def host(raw, digits=None):
+        '''The hostname as urlparse would have it, with None if it's empty'''
+        if raw:
+            return raw.lower()
+        return None
+else:
+    def host(raw, digits=None):
+        '''The hostname as urlparse would have it, with None if it's empty.
+        Python 2's is empty rather than None when a port (even an empty one)
+        follows it, so that's the case if there are port digits.'''
+        if raw:
+            return raw.lower()
+        if digits is not None:
+            return raw
+        return None
+
+
+def scan(url):
+    '''Return the (scheme, host, port, path, params, query, fragment,
+    userinfo) of a unicode url, as urlparse and its hostname, port and
+    userinfo would have them, or None if it's not a url this handles. An
+    invalid port is None.'''
+    match = _URL.match(url)
+    if match is None:
+        return None
+    scheme, netloc, info, hostname, digits, path, query, fragment = (
+        match.groups())
+    if netloc and not _ascii(netloc) and _nfkc_delimiters(netloc):
+        # urlparse (at least in newer versions) raises ValueError
+        return None
+    scheme = scheme.lower() if scheme else ''
+    path, params = split_params(scheme, path)
+    return (scheme, host(hostname, digits), port(digits), path, params, query or '',
+        fragment or '', userinfo(info))
@@ -0,0 +1,277 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''A compact set of the urls that have been seen, for deduplicating links.
+
+Rather than the urls themselves, a `SeenSet` keeps the 8-byte `fingerprint`
+of each one, so urls that are `equiv` are the same as far as it's concerned.
+The fingerprints are kept in an open-addressed hash table in a flat array,
+which takes a few tens of bytes per url rather than the hundred or more of a
+set of strings:
+
+    seen = url.seen.SeenSet()
+    if seen.add('http://foo.com:80/?b=2&a=1#frag'):
+        ...  # The first time it's been seen
+    'http://FOO.com/?a=1&b=2' in seen  # True
+
+In 'bloom' mode it's a Bloom filter of a fixed capacity instead, which takes
+a couple of bytes per url at the cost of the occasional false positive. Either
+way, it can be saved to a file with `snapshot` and read back with `load`.
+'''
+
+import math
+import os
+import struct
+import sys
+from array import array
+
+from . import URL, InvalidURL, _check_errors
+
+# The array typecode of unsigned 64-bit integers
+try:
+    array('Q')
+    TYPECODE = 'Q'
+except ValueError:
+    # Python 2, where it's an unsigned long on 64-bit platforms
+    TYPECODE = 'L'
+
+# Fraction of the table that may be full before it's doubled in size
+MAX_LOAD = 0.66
+
+_MASK = (1 << 64) - 1
+
+# Snapshots are this magic, the mode, and then the mode's header and data
+_MAGIC = b'URLSEEN1'
+_TABLE = 0
+_BLOOM = 1
+_HEADER = struct.Struct('<8sB')
+_TABLE_HEADER = struct.Struct('<QQ')
+_BLOOM_HEADER = struct.Struct('<QQQQ')
+
+
+class SeenSet(object):
+    '''A set of urls by fingerprint, as a hash table ('table' mode) or as a
+    Bloom filter ('bloom' mode) for up to `capacity` urls with a false
+    positive rate of about `error_rate`'''
+
+    def __init__(self, capacity=1024, mode='table', error_rate=0.001,
+                 encoding='utf-8'):
+        if capacity < 1:
+            raise ValueError('capacity must be positive')
+        if mode not in ('table', 'bloom'):
+            raise ValueError('Unknown mode %r' % mode)
+        if not 0 < error_rate < 1:
+            raise ValueError('error_rate must be between 0 and 1')
+        self.mode = mode
+        self.encoding = encoding
+        self._count = 0
+        if mode == 'table':
+            size = 8
+            while size * MAX_LOAD < capacity:
+                size *= 2
+            self._table = array(TYPECODE, [0]) * size
+        else:
+            # The optimal number of bits and of hashes for the capacity
+            bits = int(math.ceil(
+                -capacity * math.log(error_rate) / math.log(2) ** 2))
+            self._bits = max(8, bits)
+            self._hashes = max(1, int(round(
+                float(self._bits) / capacity * math.log(2))))
+            self._capacity = capacity
+            self._bloom = bytearray((self._bits + 7) // 8)
+
+    def fingerprint(self, url):
+        '''Return the fingerprint of a URL or raw url. Bloom filters use 16
+        bytes, and tables 8 (with 0 kept for empty slots).'''
+        if not isinstance(url, URL):
+            url = URL.parse(url, self.encoding)
+        if self.mode == 'bloom':
+            return url.fingerprint(16)
+        return url.fingerprint(8) or 1
+
+    def add(self, url):
+        '''Add a URL or raw url, returning True if it hadn't been seen'''
+        return self._add(self.fingerprint(url))
+
+    def __contains__(self, url):
+        return self._contains(self.fingerprint(url))
+
+    def add_many(self, urls, errors='replace'):
+        '''Add each of an iterable of urls, returning a list of whether each
+        one hadn't been seen (including earlier in the same batch). Urls
+        that cannot be fingerprinted are handled according to `errors`, as
+        for `parse_many`.'''
+        return self._many(self._add, urls, errors)
+
+    def contains_many(self, urls, errors='replace'):
+        '''Return a list of whether each of an iterable of urls has been
+        seen, with those that cannot be fingerprinted handled as for
+        `add_many`'''
+        return self._many(self._contains, urls, errors)
+
+    def _many(self, function, urls, errors):
+        '''Return a list of function(fingerprint) for each of the urls'''
+        _check_errors(errors)
+        fingerprint = self.fingerprint
+        results = []
+        append = results.append
+        for url in urls:
+            try:
+                value = fingerprint(url)
+            except (TypeError, ValueError) as exc:
+                if errors == 'strict':
+                    raise InvalidURL(url, exc)
+                elif errors == 'replace':
+                    append(InvalidURL(url, exc))
+                continue
+            append(function(value))
+        return results
+
+    def __len__(self):
+        '''The number of distinct urls added (in bloom mode, the number that
+        weren't false positives)'''
+        return self._count
+
+    def _add(self, value):
+        if self.mode == 'bloom':
+            return self._bloom_add(value)
+        table = self._table
+        mask = len(table) - 1
+        index = value & mask
+        while True:
+            slot = table[index]
+            if slot == value:
+                return False
+            if not slot:
+                break
+            index = (index + 1) & mask
+        table[index] = value
+        self._count += 1
+        if self._count > len(table) * MAX_LOAD:
+            self._grow()
+        return True
+
+    def _contains(self, value):
+        if self.mode == 'bloom':
+            return all(self._bloom[bit >> 3] & (1 << (bit & 7))
+                for bit in self._bloom_bits(value))
+        table = self._table
+        mask = len(table) - 1
+        index = value & mask
+        while True:
+            slot = table[index]
+            if slot == value:
+                return True
+            if not slot:
+                return False
+            index = (index + 1) & mask
+
+    def _grow(self):
+        '''Double the size of the table, and put every fingerprint back'''
+        old = self._table
+        table = self._table = array(TYPECODE, [0]) * (2 * len(old))
+        mask = len(table) - 1
+        for value in old:
+            if value:
+                index = value & mask
+                while table[index]:
+                    index = (index + 1) & mask
+                table[index] = value
+
+    def _bloom_bits(self, value):
+        '''The bits of a 16-byte fingerprint, by double hashing'''
+        first = value >> 64
+        second = (value & _MASK) | 1
+        bits = self._bits
+        return [(first + index * second) % bits
+            for index in range(self._hashes)]
+
+    def _bloom_add(self, value):
+        bloom = self._bloom
+        added = False
+        for bit in self._bloom_bits(value):
+            byte, flag = bit >> 3, 1 << (bit & 7)
+            if not bloom[byte] & flag:
+                bloom[byte] |= flag
+                added = True
+        if added:
+            self._count += 1
+        return added
+
+    def memory(self):
+        '''Return the number of bytes of the table or filter'''
+        if self.mode == 'bloom':
+            return len(self._bloom)
+        return len(self._table) * self._table.itemsize
+
+    def snapshot(self, path):
+        '''Save the set to a file, replacing it all at once'''
+        temp = path + '.tmp'
+        with open(temp, 'wb') as fout:
+            if self.mode == 'bloom':
+                fout.write(_HEADER.pack(_MAGIC, _BLOOM))
+                fout.write(_BLOOM_HEADER.pack(self._count, self._capacity,
+                    self._bits, self._hashes))
+                fout.write(self._bloom)
+            else:
+                fout.write(_HEADER.pack(_MAGIC, _TABLE))
+                fout.write(_TABLE_HEADER.pack(self._count, len(self._table)))
+                table = self._table
+                if sys.byteorder == 'big':
+                    table = array(TYPECODE, table)
+                    table.byteswap()
+                table.tofile(fout)
+        getattr(os, 'replace', os.rename)(temp, path)
+
+    @classmethod
+    def load(cls, path, encoding='utf-8'):
+        '''Return the SeenSet saved to a file with snapshot'''
+        with open(path, 'rb') as fin:
+            magic, mode = _HEADER.unpack(fin.read(_HEADER.size))
+            if magic != _MAGIC or mode not in (_TABLE, _BLOOM):
+                raise ValueError('Not a SeenSet snapshot: %r' % path)
+            result = cls.__new__(cls)
+            result.encoding = encoding
+            if mode == _BLOOM:
+                result.mode = 'bloom'
+                (result._count, result._capacity, result._bits,
+                    result._hashes) = _BLOOM_HEADER.unpack(
+                        fin.read(_BLOOM_HEADER.size))
+                result._bloom = bytearray(fin.read())
+                if len(result._bloom) != (result._bits + 7) // 8:
+                    raise ValueError('Truncated SeenSet snapshot: %r' % path)
+            else:
+                result.mode = 'table'
+                result._count, size = _TABLE_HEADER.unpack(
+                    fin.read(_TABLE_HEADER.size))
+                result._table = array(TYPECODE)
+                try:
+                    result._table.fromfile(fin, size)
+                except EOFError:
+                    raise ValueError('Truncated SeenSet snapshot: %r' % path)
+                if sys.byteorder == 'big':
+                    result._table.byteswap()
+        return result
+
+    def __repr__(self):
+        return '<url.seen.SeenSet %s of %d urls>' % (self.mode, self._count)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Assign urls to shards by their pay-level domain (or host).
+
+Each domain is hashed with md5, which unlike `hash()` is the same in every
+process and version of Python, and the hash is assigned to one of the shards
+with jump consistent hashing (https://arxiv.org/abs/1406.2294). Going from N
+to N + 1 shards only moves about 1 / (N + 1) of the domains, all of them onto
+the new shard:
+
+    sharder = url.shard.Sharder(64)
+    sharder('http://www.example.com/page')  # The shard of example.com
+    sharder.shard_many(urls)                  # An array of shards
+
+Which shard each host is on is memoized, so the pld of a host is only looked
+up once.
+'''
+
+import hashlib
+from array import array
+
+from . import URL, _remember, domain_parts, to_ascii, to_unicode
+
+# The keys that urls can be sharded by
+KEYS = ('pld', 'host')
+
+# Multiplier of the linear congruential generator of jump consistent hashing
+_JUMP = 2862933555777941757
+_MASK = (1 << 64) - 1
+
+
+def stable_hash(key):
+    '''Return a 64-bit hash of a string that's the same everywhere'''
+    if not isinstance(key, bytes):
+        key = key.encode('utf-8')
+    return int(hashlib.md5(key).hexdigest()[:16], 16)
+
+
+def jump(value, shards):
+    '''Return the shard, from 0 to shards - 1, of a 64-bit hash value'''
+    result, index = -1, 0
+    while index < shards:
+        result = index
+        value = (value * _JUMP + 1) & _MASK
+        index = int((result + 1) * (float(1 << 31) / float((value >> 33) + 1)))
+    return result
+
+
+class Sharder(object):
+    '''Assigns urls to one of a number of shards by pld or host'''
+
+    # Hosts whose shard is remembered
+    CACHE_SIZE = 100000
+
+    def __init__(self, shards, by='pld', encoding='utf-8'):
+        if shards < 1:
+            raise ValueError('shards must be positive')
+        if by not in KEYS:
+            raise ValueError('Cannot shard by %r' % by)
+        self.shards = shards
+        self.by = by
+        self.encoding = encoding
+        self._hosts = {}
+
+    def key(self, host):
+        '''Return the key that a host is sharded on. Both the unicode and
+        punycoded forms of a host have the same key.'''
+        if not host:
+            return ''
+        if self.by == 'pld':
+            # The public suffix of a host depends on its form, so it's looked
+            # up in just the one. Hosts like IP addresses don't have a pld, and
+            # stand alone.
+            host = to_unicode(host, True)
+            host = domain_parts(host)[1] or host
+        return to_ascii(host, True)
+
+    def host(self, host):
+        '''Return the shard of a host'''
+        result = self._hosts.get(host)
+        if result is None:
+            result = jump(stable_hash(self.key(host)), self.shards)
+            _remember(self._hosts, self.CACHE_SIZE, host, result)
+        return result
+
+    def __call__(self, url):
+        '''Return the shard of a URL or raw url'''
+        if isinstance(url, URL):
+            return self.host(url.host)
+        return self.host(URL.components(url, self.encoding)[1])
+
+    def shard_many(self, urls):
+        '''Return an array of the shard of each of an iterable of URLs or raw
+        urls'''
+        hosts = self._hosts
+        components = URL.components
+        encoding = self.encoding
+        result = array('i')
+        for url in urls:
+            if isinstance(url, URL):
+                host = url.host
+            else:
+                host = components(url, encoding)[1]
+            shard = hosts.get(host)
+            if shard is None:
+                shard = self.host(host)
+            result.append(shard)
+        return result
+
+    def __reduce__(self):
+        return (Sharder, (self.shards, self.by, self.encoding))
+
+    def __repr__(self):
+        return '<url.shard.Sharder %d by %s>' % (self.shards, self.by)
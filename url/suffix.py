@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''A public suffix engine backed by a precompiled, memory-mappable index.
+
+The public suffix list is compiled once into a binary file holding a trie of
+reversed domain labels, including wildcard and exception rules. Processes then
+memory-map that file rather than each parsing the text list into its own
+structures, so the pages are shared between every process on the machine.
+
+    python -m url.suffix public_suffix_list.dat suffixes.idx
+
+The index file is laid out as:
+
+    header  magic, node count, hash table size and labels size
+    nodes   (parent, label offset, label length, negate) for each trie node
+    table   open-addressed hash table of (parent, label) -> node + 1
+    labels  the utf-8 encoded labels of all the nodes
+
+Everything but the magic and the labels is a little-endian 32-bit word.
+
+Node 0 is the root. Lookups give exactly the same results as the
+`publicsuffix` package's `PublicSuffixList.get_public_suffix`.'''
+
+import io
+import mmap
+import os
+import struct
+import sys
+from array import array
+from zlib import crc32
+
+MAGIC = b'URLPSL\x00\x01'
+HEADER = struct.Struct('<8sIII')
+NODE = struct.Struct('<IIII')
+SLOT = struct.Struct('<I')
+
+
+def default_source():
+    '''The path of the list that ships with the `publicsuffix` package'''
+    import publicsuffix
+    return os.path.join(
+        os.path.dirname(publicsuffix.__file__), 'public_suffix_list.dat')
+
+
+def rules(lines):
+    '''Yield (labels, negate) for each rule in the lines of a list file'''
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if line.startswith('//') or not line:
+            continue
+        rule = line.split()[0].lstrip('.')
+        negate = rule.startswith('!')
+        if negate:
+            rule = rule[1:]
+        yield rule.split('.'), negate
+
+
+def compile_index(lines):
+    '''Compile the lines of a public suffix list into index bytes'''
+    # Build the trie as (parent, label) -> node, with node 0 as the root.
+    # Intermediate nodes that aren't rules themselves are not negated.
+    nodes = [(0, u'')]
+    negated = [False]
+    children = {}
+    for labels, negate in rules(lines):
+        node = 0
+        for label in reversed(labels):
+            child = children.get((node, label))
+            if child is None:
+                child = children[(node, label)] = len(nodes)
+                nodes.append((node, label))
+                negated.append(False)
+            node = child
+        negated[node] = negate
+
+    labels = bytearray()
+    records = []
+    for (parent, label), negate in zip(nodes, negated):
+        encoded = label.encode('utf-8')
+        records.append(NODE.pack(parent, len(labels), len(encoded), negate))
+        labels.extend(encoded)
+
+    # A power of two at least twice the number of nodes keeps probes short
+    size = 1
+    while size < 2 * len(nodes):
+        size *= 2
+    table = [0] * size
+    for (parent, label), node in children.items():
+        slot = crc32(label.encode('utf-8'), parent) & (size - 1)
+        while table[slot]:
+            slot = (slot + 1) & (size - 1)
+        table[slot] = node + 1
+
+    return b''.join([
+        HEADER.pack(MAGIC, len(nodes), size, len(labels)),
+        b''.join(records),
+        b''.join(SLOT.pack(entry) for entry in table),
+        bytes(labels)])
+
+
+def compile_file(source, destination):
+    '''Compile the list at path `source` into an index file at `destination`'''
+    with io.open(source, encoding='utf-8') as fin:
+        data = compile_index(fin)
+    # Write it to the side and move it into place, so that processes that
+    # already have the old index mapped aren't disturbed
+    temporary = destination + '.tmp'
+    with open(temporary, 'wb') as fout:
+        fout.write(data)
+    os.rename(temporary, destination)
+
+
+def is_index(path):
+    '''Return True if path holds a compiled index rather than a text list'''
+    with open(path, 'rb') as fin:
+        return fin.read(len(MAGIC)) == MAGIC
+
+
+class SuffixIndex(object):
+    '''Public suffix lookups over compiled index bytes, which may be an mmap'''
+
+    def __init__(self, data):
+        magic, count, self._size, _ = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a public suffix index')
+        self._data = data
+        # Word offsets of the nodes and the hash table, and the byte offset of
+        # the labels that follow them
+        self._nodes = HEADER.size // 4
+        self._table = self._nodes + count * NODE.size // 4
+        self._labels = 4 * (self._table + self._size)
+        if sys.byteorder == 'little' and hasattr(memoryview, 'cast'):
+            self._words = memoryview(data)[:self._labels].cast('I')
+        else:
+            # Can't use the mapped pages directly on big-endian machines or
+            # before Python 3.3, where memoryviews can't be cast, so take a
+            # copy (swapped, if need be)
+            self._words = array('I', data[:self._labels])
+            if sys.byteorder == 'big':
+                self._words.byteswap()
+
+    @classmethod
+    def load(cls, path):
+        '''Memory-map the index file at path'''
+        with open(path, 'rb') as fin:
+            return cls(mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def _child(self, parent, label):
+        '''Return the child node of parent with the given utf-8 label, or None
+        if there's no such child'''
+        words, data, mask = self._words, self._data, self._size - 1
+        slot = crc32(label, parent) & mask
+        while True:
+            entry = words[self._table + slot]
+            if not entry:
+                return None
+            record = self._nodes + 4 * (entry - 1)
+            if words[record] == parent and words[record + 2] == len(label):
+                start = self._labels + words[record + 1]
+                if data[start:start + len(label)] == label:
+                    return entry - 1
+            slot = (slot + 1) & mask
+
+    def _lookup(self, hits, depth, node, labels):
+        # Mirrors PublicSuffixList._lookup_node: a node at depth d marks
+        # whether one more label than it covers is a registered domain, and
+        # the exact label is visited after the wildcard so that it wins
+        hits[-depth] = self._words[self._nodes + 4 * node + 3]
+        if depth < len(labels):
+            for label in (b'*', labels[-depth]):
+                child = self._child(node, label)
+                if child is not None:
+                    self._lookup(hits, depth + 1, child, labels)
+
+    def get_public_suffix(self, domain):
+        '''get_public_suffix("www.example.com") -> "example.com"'''
+        parts = domain.lower().strip('.').split('.')
+        labels = [part.encode('utf-8') for part in parts]
+        hits = [None] * len(parts)
+        self._lookup(hits, 1, 0, labels)
+        for index, negate in enumerate(hits):
+            if negate == 0:
+                return '.'.join(parts[index:])
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (2, 3):
+        print('Usage: python -m url.suffix [source.dat] destination.idx')
+        sys.exit(1)
+    compile_file(
+        sys.argv[1] if len(sys.argv) == 3 else default_source(), sys.argv[-1])
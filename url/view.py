@@ -0,0 +1,311 @@
+#!/usr/bin/env python
+#
+# Copyright (c) 2012-2013 SEOmoz, Inc.
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE
+# LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION
+# WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+'''Read-only views of urls in a buffer of bytes.
+
+Parsing a url makes a string of every one of its components, even when all
+that's wanted is its host. A `URLView` instead keeps the buffer (bytes, a
+bytearray, a memoryview or an mmap) and where each component starts and ends
+in it, and only makes a string of a component when it's read:
+
+    for view in url.views(mmap.mmap(fd, 0, access=mmap.ACCESS_READ)):
+        hosts[view.host] += 1
+
+Components read from a view are the same as those of `url.parse` for the same
+bytes. Only ASCII urls that the single-pass scanner handles are viewed in
+place; the rest are parsed up front.
+'''
+
+import re
+import struct
+import sys
+
+from . import InvalidURL, URL, domain_parts, DomainParts, _check_errors
+from .scanner import URL_BYTES, host, port, split_params, userinfo
+
+# Nonempty lines in a buffer
+_LINE = re.compile(b'[^\r\n]+')
+
+# Whether each encoding decodes ASCII bytes to the same characters, in which
+# case an ASCII url can be viewed without decoding the whole thing
+_ASCII_BYTES = bytes(bytearray(range(128)))
+_compatible = {}
+
+
+def _ascii_compatible(encoding):
+    '''Return True if ASCII bytes decode the same way in this encoding'''
+    result = _compatible.get(encoding)
+    if result is None:
+        try:
+            result = (
+                _ASCII_BYTES.decode(encoding) == _ASCII_BYTES.decode('ascii'))
+        except (LookupError, UnicodeDecodeError):
+            # Left to url.parse, which raises for an unknown encoding
+            result = False
+        _compatible[encoding] = result
+    return result
+
+
+if sys.version_info[0] == 3:
+    def _text(value):
+        '''Convert the bytes of an ASCII component to a string'''
+        return value.decode('ascii')
+else:
+    def _text(value):
+        '''Convert the bytes of an ASCII component to a string'''
+        return str(value)
+
+
+# The groups of URL_BYTES that views read, which is all but the netloc. A
+# view packs the start and end in the buffer of each of them, which are -1 for
+# groups that didn't take part in the match, and _GROUPS reads one's back out.
+_VIEWED = (1, 3, 4, 5, 6, 7, 8)
+_OFFSETS = struct.Struct('=%dq' % (2 * len(_VIEWED)))
+_GROUPS = dict((group, struct.Struct('=%dxqq' % (16 * index)))
+    for index, group in enumerate(_VIEWED))
+
+
+if sys.version_info[0] == 3:
+    def _matchable(buffer):
+        '''The buffer, in a form that regular expressions can match'''
+        return buffer
+else:
+    def _matchable(buffer):
+        '''The buffer, in a form that regular expressions can match. They
+        can't match memoryviews in Python 2, so those are copied.'''
+        if isinstance(buffer, memoryview):
+            return buffer.tobytes()
+        return buffer
+
+
+def _bytes(buffer, start, end):
+    '''A copy of the bytes between start and end of a buffer'''
+    value = buffer[start:end]
+    if isinstance(value, memoryview):
+        return value.tobytes()
+    return bytes(value)
+
+
+def _fill(view, buffer, start, end, encoding, viewable):
+    '''Set up a view of a url in a buffer, in place if it's viewable in an
+    encoding that agrees with ASCII and the scanner handles it'''
+    match = viewable and URL_BYTES.match(buffer, start, end)
+    if match:
+        view._buffer = buffer
+        # Spans are much cheaper than match.regs, which makes a tuple of
+        # every group's as well
+        view._offsets = _OFFSETS.pack(*sum(map(match.span, _VIEWED), ()))
+        view._url = None
+    else:
+        view._buffer = view._offsets = None
+        view._url = URL.parse(_bytes(buffer, start, end), encoding)
+
+
+def views(buffer, start=0, end=None, encoding='utf-8', errors='replace'):
+    '''Yield a URLView of each nonempty line between start and end of a
+    buffer. Lines that cannot be parsed are handled according to `errors`,
+    as for `parse_many`.'''
+    _check_errors(errors)
+    buffer = _matchable(buffer)
+    if end is None:
+        end = len(buffer)
+    # Everything that's the same for every line is worked out just the once
+    viewable = _ascii_compatible(encoding)
+    new = URLView.__new__
+    for line in _LINE.finditer(buffer, start, end):
+        try:
+            view = new(URLView)
+            _fill(view, buffer, line.start(), line.end(), encoding, viewable)
+            yield view
+        except (TypeError, ValueError) as exc:
+            if errors == 'strict':
+                raise InvalidURL(line.group(), exc)
+            elif errors == 'replace':
+                yield InvalidURL(line.group(), exc)
+
+
+class URLView(object):
+    '''A read-only view of the url between start and end of a buffer'''
+
+    # For urls viewed in place, the buffer and the offsets of each of their
+    # components, packed as described for _GROUPS. For the rest, the parsed
+    # url is kept instead.
+    __slots__ = ('_buffer', '_offsets', '_url')
+
+    def __init__(self, buffer, start=0, end=None, encoding='utf-8'):
+        buffer = _matchable(buffer)
+        if end is None:
+            end = len(buffer)
+        _fill(self, buffer, start, end, encoding, _ascii_compatible(encoding))
+
+    def _group(self, index):
+        '''The bytes of one group of the scanned url, or None if it didn't
+        take part in the match'''
+        start, end = _GROUPS[index].unpack_from(self._offsets)
+        if start < 0:
+            return None
+        value = self._buffer[start:end]
+        if isinstance(value, memoryview):
+            return value.tobytes()
+        return value
+
+    @property
+    def scheme(self):
+        if self._url is not None:
+            return self._url.scheme
+        scheme = self._group(1)
+        if scheme:
+            return _text(scheme.lower())
+        return ''
+
+    @property
+    def userinfo(self):
+        if self._url is not None:
+            return self._url.userinfo
+        value = self._group(3)
+        if value is None:
+            return None
+        return userinfo(_text(value))
+
+    @property
+    def host(self):
+        if self._url is not None:
+            return self._url.host
+        value = self._group(4)
+        if value:
+            return _text(host(value))
+        # Empty hosts may be empty strings rather than None, by the port
+        value = host(value, self._group(5))
+        if value is None:
+            return None
+        return _text(value)
+
+    @property
+    def port(self):
+        if self._url is not None:
+            return self._url.port
+        return port(self._group(5))
+
+    @property
+    def netloc(self):
+        if self._url is not None:
+            return self._url.netloc
+        netloc = self.host or ''
+        value = self.port
+        if value:
+            netloc += (':' + str(value))
+
+        value = self.userinfo
+        if value is not None:
+            netloc = '%s@%s' % (value, netloc)
+        return netloc
+
+    @property
+    def path(self):
+        if self._url is not None:
+            return self._url.path
+        return self._split_params()[0] or '/'
+
+    @property
+    def params(self):
+        if self._url is not None:
+            return self._url.params
+        return URL.clean_params(self._split_params()[1])
+
+    @property
+    def query(self):
+        if self._url is not None:
+            return self._url.query
+        value = self._group(7)
+        if value:
+            return URL.clean_query(_text(value))
+        return ''
+
+    @property
+    def fragment(self):
+        if self._url is not None:
+            return self._url.fragment
+        value = self._group(8)
+        if value:
+            return _text(value)
+        return ''
+
+    def _split_params(self):
+        '''The (path, params) of a url viewed in place'''
+        path = self._group(6)
+        if b';' in path:
+            return split_params(self.scheme, _text(path))
+        return _text(path), ''
+
+    def components(self):
+        '''Return the (scheme, host, port, path, params, query, fragment,
+        userinfo) of the url, as URL.components would. For urls that aren't
+        viewed in place, they're those of the parsed url.'''
+        url = self._url
+        if url is not None:
+            return (url.scheme, url.host, url.port, url.path, url.params,
+                url.query, url.fragment, url.userinfo)
+        path, params = self._split_params()
+        return (self.scheme, self.host, self.port, path, params,
+            _text(self._group(7) or b''), self.fragment, self.userinfo)
+
+    def to_url(self):
+        '''Return a URL with the components of this view, for chaining'''
+        if self._url is not None:
+            return self._url.copy()
+        return URL.from_components(self.components())
+
+    ###########################################################################
+    # Information about the domain
+    ###########################################################################
+    def domain_parts(self):
+        '''Return the (subdomain, pld, tld) of the url all at once'''
+        value = self.host
+        if value:
+            return domain_parts(value)
+        return DomainParts('', '', '')
+
+    def pld(self):
+        '''Return the 'pay-level domain' of the url'''
+        value = self.host
+        if value:
+            return domain_parts(value)[1]
+        return ''
+
+    def tld(self):
+        '''Return the top-level domain of a url'''
+        value = self.host
+        if value:
+            return domain_parts(value)[2]
+        return ''
+
+    def absolute(self):
+        '''Return True if this is a fully-qualified URL with a hostname and
+        everything'''
+        return bool(self.host)
+
+    def __str__(self):
+        return str(self.to_url())
+
+    def __repr__(self):
+        return '<url.URLView object "%s" >' % str(self)